@@ -1,21 +1,73 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+try:
+    import xlsxwriter  # noqa: F401
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+def leer_excel(ruta):
+    return pd.read_excel(ruta, engine=EXCEL_ENGINE)
+
+def resolver_salida(archivo_salida):
+    # Sin pyarrow no se puede escribir Parquet: se cambia a .xlsx antes de leer nada
+    base, extension = os.path.splitext(archivo_salida)
+    if extension.lower() == '.parquet' and not PYARROW_AVAILABLE:
+        print("pyarrow no está instalado; se guardará en formato .xlsx")
+        return base + '.xlsx'
+    return archivo_salida
+
+def normalizar_columnas_mixtas(df):
+    # pyarrow rechaza columnas object que mezclan números y texto (habitual al juntar
+    # facturas distintas): se convierten a texto conservando los vacíos
+    for columna in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[columna], skipna=True) in ('mixed', 'mixed-integer'):
+            df[columna] = df[columna].astype(str).where(df[columna].notna(), None)
+    return df
+
+def guardar_consolidado(df, archivo_salida):
+    extension = os.path.splitext(archivo_salida)[1].lower()
+    if extension == '.parquet':
+        df = normalizar_columnas_mixtas(df)
+        df.to_parquet(archivo_salida, engine='pyarrow', compression='zstd', index=False)
+    elif extension == '.csv':
+        df.to_csv(archivo_salida, index=False, encoding='utf-8')
+    elif XLSXWRITER_AVAILABLE:
+        # xlsxwriter en modo constant_memory escribe fila a fila sin mantener la hoja en RAM
+        with pd.ExcelWriter(archivo_salida, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True}}) as writer:
+            df.to_excel(writer, index=False)
+    else:
+        df.to_excel(archivo_salida, index=False)
+
 def consolidar_excels(directorio, archivo_salida):
-    archivos = [f for f in os.listdir(directorio) if f.endswith('.xlsx')]
-    dataframes = []
-    for archivo in archivos:
-        ruta = os.path.join(directorio, archivo)
-        df = pd.read_excel(ruta)
-        dataframes.append(df)
+    archivo_salida = resolver_salida(archivo_salida)
+    with os.scandir(directorio) as entradas:
+        rutas = [e.path for e in entradas if e.name.endswith('.xlsx') and e.is_file()]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        dataframes = list(executor.map(leer_excel, rutas))
     if dataframes:
         df_consolidado = pd.concat(dataframes, ignore_index=True)
-        df_consolidado.to_excel(archivo_salida, index=False)
+        guardar_consolidado(df_consolidado, archivo_salida)
         print(f"Consolidado guardado en: {archivo_salida}")
     else:
         print("No se encontraron archivos .xlsx en la carpeta.")
 
 if __name__ == "__main__":
     carpeta = "/Users/leandrodebagge/Desktop/Compartido"
-    salida = "consolidado.xlsx"
+    salida = "consolidado.parquet"
     consolidar_excels(carpeta, salida)
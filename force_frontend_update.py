@@ -7,10 +7,26 @@ import requests
 import json
 import sys
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Subida en streaming del PDF (evita cargar el archivo entero en memoria)
+try:
+    from requests_toolbelt import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
 
 # URL base del servidor
 BASE_URL = "http://127.0.0.1:8000"
 
+# Sesión compartida: reutiliza las conexiones TCP/TLS entre peticiones
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=50, pool_maxsize=50,
+                       max_retries=Retry(total=3, backoff_factor=0.2))
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 def create_admin_user():
     """Crear usuario admin para testing"""
     try:
@@ -22,7 +38,7 @@ def create_admin_user():
         }
         
         # Intentar crear usuario
-        response = requests.post(f"{BASE_URL}/api/auth/register", json=admin_data)
+        response = _SESSION.post(f"{BASE_URL}/api/auth/register", json=admin_data)
         if response.status_code == 201:
             print("✅ Usuario admin creado")
         elif response.status_code == 400 and "already registered" in response.text:
@@ -36,7 +52,7 @@ def create_admin_user():
             "password": admin_data["password"]
         }
         
-        login_response = requests.post(f"{BASE_URL}/api/auth/login", data=login_data)
+        login_response = _SESSION.post(f"{BASE_URL}/api/auth/login", data=login_data)
         if login_response.status_code == 200:
             token_data = login_response.json()
             token = token_data.get("access_token")
@@ -71,9 +87,15 @@ def upload_and_test_document(token):
         # Subir documento
         print("📤 Subiendo documento...")
         with open(pdf_path, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(f"{BASE_URL}/api/document-ai/upload", 
-                                   headers=headers, files=files)
+            if TOOLBELT_AVAILABLE:
+                encoder = MultipartEncoder(fields={'file': (Path(pdf_path).name, f, 'application/pdf')})
+                response = _SESSION.post(f"{BASE_URL}/api/document-ai/upload", 
+                                         headers={**headers, "Content-Type": encoder.content_type},
+                                         data=encoder)
+            else:
+                files = {'file': f}
+                response = _SESSION.post(f"{BASE_URL}/api/document-ai/upload", 
+                                         headers=headers, files=files)
         
         if response.status_code == 200:
             doc_data = response.json()
@@ -82,8 +104,8 @@ def upload_and_test_document(token):
             
             # Obtener recomendaciones
             print("🔍 Obteniendo recomendaciones...")
-            rec_response = requests.get(f"{BASE_URL}/api/document-ai/documents/{doc_id}/recommendations",
-                                      headers=headers)
+            rec_response = _SESSION.get(f"{BASE_URL}/api/document-ai/documents/{doc_id}/recommendations",
+                                        headers=headers)
             
             if rec_response.status_code == 200:
                 recommendations = rec_response.json()
@@ -109,9 +131,9 @@ def upload_and_test_document(token):
                 "custom_filename": "enhanced_test_word"
             }
             
-            export_response = requests.post(f"{BASE_URL}/api/document-ai/export",
-                                          headers={**headers, "Content-Type": "application/json"},
-                                          json=export_data)
+            export_response = _SESSION.post(f"{BASE_URL}/api/document-ai/export",
+                                            headers={**headers, "Content-Type": "application/json"},
+                                            json=export_data)
             
             if export_response.status_code == 200:
                 export_result = export_response.json()
@@ -126,9 +148,9 @@ def upload_and_test_document(token):
             export_data["format"] = "xlsx"
             export_data["custom_filename"] = "enhanced_test_excel"
             
-            export_response = requests.post(f"{BASE_URL}/api/document-ai/export",
-                                          headers={**headers, "Content-Type": "application/json"},
-                                          json=export_data)
+            export_response = _SESSION.post(f"{BASE_URL}/api/document-ai/export",
+                                            headers={**headers, "Content-Type": "application/json"},
+                                            json=export_data)
             
             if export_response.status_code == 200:
                 export_result = export_response.json()
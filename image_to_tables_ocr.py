@@ -1,18 +1,123 @@
 import os
 import sys
 import argparse
-import pandas as pd
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
-from PIL import Image, ImageEnhance, ImageFilter
-import pytesseract
-from pytesseract import Output
-import cv2
 from typing import List, Tuple, Optional
 
+# cv2, pytesseract, pandas, PIL y tesserocr se importan dentro de las funciones
+# que los usan: así importar el módulo (o ejecutar --help) no paga su tiempo de carga
+
+try:
+    import xlsxwriter  # noqa: F401
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+OCR_WHITELIST = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,:-/()$%'
+
+# Dimensión máxima (px) de la imagen que se pasa al OCR (~300 DPI en A4)
+MAX_OCR_DIMENSION = 3500
+
+# Desviación máxima de las medias por bloques de 32x32 para considerar
+# que la iluminación es uniforme y basta un umbral global (Otsu)
+UNIFORM_LIGHTING_STD = 15
+
+# Proporción mínima de píxeles de tinta para que una celda se envíe al OCR
+MIN_CELL_INK_DENSITY = 0.02
+
+# A partir de este número de celdas se agrupan las filas con Numba (si está instalado)
+NUMBA_MIN_CELLS = 500
+
+# Separadores de columnas en texto plano, en orden de preferencia. Cada línea se
+# corta solo por el que da más partes, así "10,50" sobrevive en una tabla separada
+# por espacios o barras
+_SEPARATORS = ('\t', '|', ';', '  ', ',')
+
+# Kernel de enfoque (3x3) usado en el preprocesamiento
+SHARPEN_KERNEL = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]], dtype=np.float32)
+
+@lru_cache(maxsize=None)
+def _get_tesserocr():
+    """
+    Devuelve el módulo tesserocr (API en proceso de Tesseract), o None si no está instalado.
+    """
+    try:
+        import tesserocr
+    except ImportError:
+        return None
+    return tesserocr
+
+# Instancias de PyTessBaseAPI reutilizadas entre llamadas. La API no es
+# thread-safe, así que cada hilo mantiene las suyas (una por idioma).
+_TESS_LOCAL = threading.local()
+
+def _get_tess_api(lang: str):
+    """
+    Devuelve la instancia de Tesseract del hilo actual para el idioma indicado.
+    """
+    apis = getattr(_TESS_LOCAL, 'apis', None)
+    if apis is None:
+        apis = _TESS_LOCAL.apis = {}
+    api = apis.get(lang)
+    if api is None:
+        tesserocr = _get_tesserocr()
+        api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_BLOCK,
+                                      oem=tesserocr.OEM.LSTM_ONLY, lang=lang)
+        api.SetVariable('tessedit_char_whitelist', OCR_WHITELIST)
+        apis[lang] = api
+    return api
+
+# Objetos de OpenCV reutilizados entre imágenes. CLAHE guarda estado interno,
+# así que, igual que la API de Tesseract, se mantiene uno por hilo junto con
+# el buffer auxiliar del preprocesamiento.
+_CV_LOCAL = threading.local()
+
+def _get_clahe():
+    """
+    Devuelve el objeto CLAHE del hilo actual.
+    """
+    clahe = getattr(_CV_LOCAL, 'clahe', None)
+    if clahe is None:
+        import cv2
+        clahe = _CV_LOCAL.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    return clahe
+
+def _get_scratch_buffer(shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Devuelve el buffer auxiliar del hilo actual, reservándolo solo si cambia el tamaño.
+    """
+    buf = getattr(_CV_LOCAL, 'scratch', None)
+    if buf is None or buf.shape != shape:
+        buf = _CV_LOCAL.scratch = np.empty(shape, dtype=np.uint8)
+    return buf
+
+@lru_cache(maxsize=None)
+def _get_ocr_executor() -> ThreadPoolExecutor:
+    """
+    Pool de hilos para el OCR por celda. Se crea una sola vez y se mantiene vivo
+    para que cada hilo conserve sus instancias de Tesseract entre imágenes.
+    """
+    return ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='ocr')
+
+@lru_cache(maxsize=None)
+def _get_line_kernels():
+    """
+    Elementos estructurantes para detectar líneas horizontales y verticales.
+    """
+    import cv2
+    return (cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1)),
+            cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40)))
+
 def preprocess_image(image_path: str) -> np.ndarray:
     """
     Preprocesa la imagen para mejorar la calidad del OCR.
     """
+    import cv2
+    
     print(f"Preprocesando imagen: {image_path}")
     
     # Cargar imagen con OpenCV
@@ -23,44 +128,65 @@ def preprocess_image(image_path: str) -> np.ndarray:
     # Convertir a escala de grises
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     
+    # Reducir escaneos sobredimensionados: el coste del OCR crece con el área
+    scale = min(1.0, MAX_OCR_DIMENSION / max(gray.shape))
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        print(f"Imagen reducida al {scale:.0%} para OCR")
+    
+    # Cada paso escribe en uno de dos buffers alternos en lugar de reservar
+    # una imagen nueva por etapa. buf_a es el que se devuelve; buf_b se
+    # reutiliza entre llamadas con imágenes del mismo tamaño.
+    buf_a = gray
+    buf_b = _get_scratch_buffer(gray.shape)
+    
     # Aplicar filtro bilateral para reducir ruido preservando bordes
-    denoised = cv2.bilateralFilter(gray, 9, 75, 75)
+    cv2.bilateralFilter(buf_a, 9, 75, 75, dst=buf_b)
     
     # Mejorar contraste usando CLAHE (Contrast Limited Adaptive Histogram Equalization)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    enhanced = clahe.apply(denoised)
+    _get_clahe().apply(buf_b, dst=buf_a)
     
     # Aplicar filtro de enfoque
-    kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-    sharpened = cv2.filter2D(enhanced, -1, kernel)
+    cv2.filter2D(buf_a, cv2.CV_8U, SHARPEN_KERNEL, dst=buf_b, borderType=cv2.BORDER_REPLICATE)
     
-    # Binarización adaptativa para mejorar texto
-    binary = cv2.adaptiveThreshold(sharpened, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                   cv2.THRESH_BINARY, 11, 2)
+    # Binarización: Otsu global si la iluminación es uniforme, adaptativa si no
+    h, w = buf_b.shape
+    uniform = False
+    if h >= 32 and w >= 32:
+        block_means = cv2.resize(buf_b, (w // 32, h // 32), interpolation=cv2.INTER_AREA)
+        uniform = block_means.std() < UNIFORM_LIGHTING_STD
     
-    # Operaciones morfológicas para limpiar la imagen
-    kernel = np.ones((1,1), np.uint8)
-    cleaned = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+    if uniform:
+        cv2.threshold(buf_b, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=buf_a)
+    else:
+        cv2.adaptiveThreshold(buf_b, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+                              cv2.THRESH_BINARY, 11, 2, dst=buf_a)
     
     print("Preprocesamiento completado")
-    return cleaned
+    return buf_a
 
 def detect_table_structure(image: np.ndarray) -> List[Tuple[int, int, int, int]]:
     """
     Detecta estructuras de tabla en la imagen usando detección de líneas.
     """
+    import cv2
+    
     print("Detectando estructura de tabla...")
     
+    # Las aperturas con kernel rectangular 1-D usan el filtro separable
+    # vectorizado de OpenCV sobre una imagen CV_8UC1 contigua
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    
+    horizontal_kernel, vertical_kernel = _get_line_kernels()
+    
     # Detectar líneas horizontales
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
     horizontal_lines = cv2.morphologyEx(image, cv2.MORPH_OPEN, horizontal_kernel)
     
     # Detectar líneas verticales
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
     vertical_lines = cv2.morphologyEx(image, cv2.MORPH_OPEN, vertical_kernel)
     
-    # Combinar líneas para encontrar intersecciones
-    table_structure = cv2.add(horizontal_lines, vertical_lines)
+    # Combinar líneas para encontrar intersecciones (imagen binaria: OR == suma saturada)
+    table_structure = cv2.bitwise_or(horizontal_lines, vertical_lines, dst=horizontal_lines)
     
     # Encontrar contornos de celdas potenciales
     contours, _ = cv2.findContours(table_structure, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -79,8 +205,23 @@ def extract_text_with_enhanced_ocr(image: np.ndarray, lang='eng+spa') -> str:
     """
     Extrae texto usando configuración optimizada de OCR.
     """
+    if _get_tesserocr() is not None:
+        try:
+            api = _get_tess_api(lang)
+            if image.ndim == 2:
+                h, w = image.shape
+                api.SetImageBytes(image.tobytes(), w, h, 1, w)
+            else:
+                from PIL import Image
+                api.SetImage(Image.fromarray(image))
+            return api.GetUTF8Text().strip()
+        except Exception as e:
+            print(f"Error en OCR (tesserocr): {e}")
+    
+    import pytesseract
+    
     # Configuración específica para tablas
-    custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,:-/()$%'
+    custom_config = f'--oem 3 --psm 6 -c tessedit_char_whitelist={OCR_WHITELIST}'
     
     try:
         text = pytesseract.image_to_string(image, lang=lang, config=custom_config)
@@ -94,49 +235,165 @@ def extract_text_with_enhanced_ocr(image: np.ndarray, lang='eng+spa') -> str:
         except:
             return ""
 
+def extract_cell_text(cell_img: np.ndarray) -> str:
+    """
+    Aplica OCR a una celda, omitiendo las que están prácticamente en blanco.
+    """
+    import cv2
+    
+    if cell_img.size == 0:
+        return ""
+    
+    # Imagen binaria con fondo blanco: los píxeles a cero son tinta
+    ink_pixels = cell_img.size - cv2.countNonZero(cell_img)
+    if ink_pixels / cell_img.size < MIN_CELL_INK_DENSITY:
+        return ""
+    
+    return extract_text_with_enhanced_ocr(cell_img)
+
+def extract_words_with_boxes(image: np.ndarray, lang='eng+spa') -> Tuple[List[str], np.ndarray]:
+    """
+    Ejecuta OCR una sola vez sobre toda la imagen y devuelve las palabras
+    junto a sus cajas (x, y, w, h) en orden de lectura.
+    """
+    words = []
+    boxes = []
+    
+    tesserocr = _get_tesserocr()
+    if tesserocr is not None:
+        try:
+            api = _get_tess_api(lang)
+            h, w = image.shape[:2]
+            api.SetImageBytes(np.ascontiguousarray(image).tobytes(), w, h, 1, w)
+            api.Recognize()
+            for result in tesserocr.iterate_level(api.GetIterator(), tesserocr.RIL.WORD):
+                word = result.GetUTF8Text(tesserocr.RIL.WORD)
+                if word and word.strip():
+                    x1, y1, x2, y2 = result.BoundingBox(tesserocr.RIL.WORD)
+                    words.append(word.strip())
+                    boxes.append((x1, y1, x2 - x1, y2 - y1))
+            return words, np.array(boxes, dtype=np.int32).reshape(-1, 4)
+        except Exception as e:
+            print(f"Error en OCR (tesserocr): {e}")
+            words, boxes = [], []
+    
+    import pytesseract
+    from pytesseract import Output
+    
+    custom_config = f'--oem 3 --psm 6 -c tessedit_char_whitelist={OCR_WHITELIST}'
+    try:
+        data = pytesseract.image_to_data(image, lang=lang, config=custom_config, output_type=Output.DICT)
+    except Exception as e:
+        print(f"Error en OCR: {e}")
+        return words, np.empty((0, 4), dtype=np.int32)
+    
+    for word, x, y, w, h in zip(data['text'], data['left'], data['top'], data['width'], data['height']):
+        if word and word.strip():
+            words.append(word.strip())
+            boxes.append((x, y, w, h))
+    
+    return words, np.array(boxes, dtype=np.int32).reshape(-1, 4)
+
+def assign_words_to_cells(words: List[str], boxes: np.ndarray,
+                          cells: List[Tuple[int, int, int, int]]) -> List[str]:
+    """
+    Reparte las palabras reconocidas en las celdas que contienen su centro.
+    """
+    cell_texts = [''] * len(cells)
+    if not words or not cells:
+        return cell_texts
+    
+    cell_boxes = np.asarray(cells, dtype=np.int32)
+    cx = boxes[:, 0] + boxes[:, 2] // 2
+    cy = boxes[:, 1] + boxes[:, 3] // 2
+    
+    # Matriz palabras x celdas: True si el centro de la palabra cae dentro de la celda
+    inside = ((cx[:, None] >= cell_boxes[:, 0]) &
+              (cx[:, None] < cell_boxes[:, 0] + cell_boxes[:, 2]) &
+              (cy[:, None] >= cell_boxes[:, 1]) &
+              (cy[:, None] < cell_boxes[:, 1] + cell_boxes[:, 3]))
+    
+    matched = np.flatnonzero(inside.any(axis=1))
+    if matched.size == 0:
+        return cell_texts
+    word_cell = inside[matched].argmax(axis=1)
+    
+    # Orden estable por celda para conservar el orden de lectura de Tesseract
+    order = np.argsort(word_cell, kind='stable')
+    sorted_cells = word_cell[order]
+    breaks = np.flatnonzero(np.diff(sorted_cells)) + 1
+    for group in np.split(order, breaks):
+        cell_texts[word_cell[group[0]]] = ' '.join(words[matched[i]] for i in group)
+    
+    return cell_texts
+
+def _assign_rows(ys_sorted, y_tolerance, out_row):
+    """
+    Asigna a cada celda (ordenada por Y) su número de fila; devuelve el total de filas.
+    """
+    row = 0
+    for i in range(ys_sorted.size):
+        if i > 0 and ys_sorted[i] - ys_sorted[i - 1] > y_tolerance:
+            row += 1
+        out_row[i] = row
+    return row + 1
+
+@lru_cache(maxsize=None)
+def _get_compiled_assign_rows():
+    """
+    Compila _assign_rows con Numba la primera vez que se necesita (None si no hay Numba).
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_assign_rows)
+
 def extract_table_data_from_cells(image: np.ndarray, cells: List[Tuple[int, int, int, int]]) -> List[List[str]]:
     """
     Extrae datos de texto de cada celda detectada.
     """
     print("Extrayendo datos de celdas...")
     
-    cell_data = []
-    for i, (x, y, w, h) in enumerate(cells):
-        # Extraer región de la celda
-        cell_img = image[y:y+h, x:x+w]
-        
-        # Aplicar OCR a la celda
-        cell_text = extract_text_with_enhanced_ocr(cell_img)
-        
-        if cell_text:
-            cell_data.append({
-                'text': cell_text,
-                'x': x, 'y': y, 'w': w, 'h': h
-            })
+    # OCR de la página completa una sola vez y reparto de palabras por celda
+    words, boxes = extract_words_with_boxes(image)
+    cell_texts = assign_words_to_cells(words, boxes, cells)
+    
+    if not any(cell_texts):
+        # Fallback: OCR individual de cada celda, en paralelo (Tesseract libera el GIL)
+        cell_imgs = [image[y:y+h, x:x+w] for (x, y, w, h) in cells]
+        cell_texts = list(_get_ocr_executor().map(extract_cell_text, cell_imgs))
+    
+    # Celdas con texto en columnas paralelas: coordenadas en arrays, textos en lista
+    has_text = np.fromiter((bool(t) for t in cell_texts), dtype=bool, count=len(cell_texts))
     
     # Organizar celdas en filas y columnas
-    if not cell_data:
+    if not has_text.any():
         return []
     
-    # Agrupar por filas (similar coordenada Y)
-    cell_data.sort(key=lambda c: (c['y'], c['x']))
+    cell_boxes = np.asarray(cells, dtype=np.int32)[has_text]
+    xs = cell_boxes[:, 0]
+    ys = cell_boxes[:, 1]
+    texts = [t for t in cell_texts if t]
     
-    rows = []
-    current_row = []
-    current_y = cell_data[0]['y']
+    # Agrupar por filas (similar coordenada Y)
     y_tolerance = 20  # Tolerancia para considerar misma fila
     
-    for cell in cell_data:
-        if abs(cell['y'] - current_y) <= y_tolerance:
-            current_row.append(cell['text'])
-        else:
-            if current_row:
-                rows.append(current_row)
-            current_row = [cell['text']]
-            current_y = cell['y']
+    # Ordenar por (y, x) y cortar una fila nueva donde el salto en Y supera la tolerancia
+    order = np.lexsort((xs, ys))
+    assign_rows = _get_compiled_assign_rows() if order.size >= NUMBA_MIN_CELLS else None
     
-    if current_row:
-        rows.append(current_row)
+    if assign_rows is not None:
+        # Páginas muy grandes: una sola pasada compilada y un único recorrido en Python
+        row_ids = np.empty(order.size, dtype=np.int32)
+        n_rows = assign_rows(ys[order], y_tolerance, row_ids)
+        rows = [[] for _ in range(n_rows)]
+        for row_id, i in zip(row_ids.tolist(), order.tolist()):
+            rows[row_id].append(texts[i])
+    else:
+        breaks = np.flatnonzero(np.diff(ys[order]) > y_tolerance) + 1
+        row_groups = np.split(order, breaks)
+        rows = [[texts[i] for i in group] for group in row_groups]
     
     print(f"Organizadas {len(rows)} filas de datos")
     return rows
@@ -152,19 +409,20 @@ def process_text_to_table(text: str) -> List[List[str]]:
     # Detectar separadores comunes
     potential_rows = []
     for line in lines:
-        # Intentar diferentes separadores
-        separators = ['\t', '|', ';', '  ', ',']
         best_split = None
         max_parts = 1
         
-        for sep in separators:
-            if sep in line:
-                parts = [p.strip() for p in line.split(sep) if p.strip()]
-                if len(parts) > max_parts:
-                    max_parts = len(parts)
-                    best_split = parts
+        for sep in _SEPARATORS:
+            # count() acota las partes sin cortar la línea: si ni en el mejor caso
+            # se supera al separador actual, se omite el split
+            if line.count(sep) + 1 <= max_parts:
+                continue
+            parts = [p.strip() for p in line.split(sep) if p.strip()]
+            if len(parts) > max_parts:
+                max_parts = len(parts)
+                best_split = parts
         
-        if best_split and len(best_split) >= 2:
+        if best_split:
             potential_rows.append(best_split)
         elif len(line.split()) >= 3:  # Al menos 3 palabras
             potential_rows.append(line.split())
@@ -175,6 +433,10 @@ def ocr_image_to_tables(image_path, output_path, format_type="excel"):
     """
     Extrae tablas de una imagen usando OCR mejorado y detección de estructura.
     """
+    import pandas as pd
+    import pytesseract
+    from pytesseract import Output
+    
     if not os.path.exists(image_path):
         print(f"Error: El archivo {image_path} no existe.")
         return False
@@ -202,8 +464,7 @@ def ocr_image_to_tables(image_path, output_path, format_type="excel"):
         # Método 3 (último fallback): OCR básico línea por línea
         if not table_rows:
             print("Último fallback: OCR básico...")
-            img_pil = Image.fromarray(processed_img)
-            tsv = pytesseract.image_to_data(img_pil, output_type=Output.DATAFRAME, lang='eng+spa')
+            tsv = pytesseract.image_to_data(processed_img, output_type=Output.DATAFRAME, lang='eng+spa')
             tsv = tsv[tsv['text'].notnull() & (tsv['text'].str.strip() != '')]
             
             line_data = []
@@ -219,28 +480,30 @@ def ocr_image_to_tables(image_path, output_path, format_type="excel"):
             # Crear DataFrame vacío pero con estructura
             df = pd.DataFrame(columns=['Columna1'])
         else:
-            # Normalizar filas para que tengan el mismo número de columnas
+            # Normalizar filas para que tengan el mismo número de columnas:
+            # zip_longest rellena las filas cortas con valores vacíos
             max_cols = max(len(row) for row in table_rows)
-            normalized_rows = []
-            for row in table_rows:
-                # Rellenar filas cortas con valores vacíos
-                while len(row) < max_cols:
-                    row.append('')
-                normalized_rows.append(row[:max_cols])  # Truncar filas largas
+            padded_columns = itertools.zip_longest(*table_rows, fillvalue='')
             
             # Crear DataFrame
             columns = [f"Columna_{i+1}" for i in range(max_cols)]
-            df = pd.DataFrame(normalized_rows, columns=columns)
+            df = pd.DataFrame(list(zip(*padded_columns)), columns=columns)
             
-            # Limpiar datos vacíos
-            df = df.replace('', pd.NA).dropna(how='all').fillna('')
+            # Limpiar filas vacías
+            df = df.loc[(df != '').any(axis=1)]
         
         # Guardar resultados
         base_path = os.path.splitext(output_path)[0]
         
         if format_type == "excel" or format_type == "both":
             excel_path = base_path + ".xlsx"
-            df.to_excel(excel_path, index=False)
+            if XLSXWRITER_AVAILABLE:
+                # Escritura en streaming: las filas se vuelcan a disco sin mantener el libro en memoria
+                with pd.ExcelWriter(excel_path, engine='xlsxwriter',
+                                    engine_kwargs={'options': {'constant_memory': True}}) as writer:
+                    df.to_excel(writer, index=False)
+            else:
+                df.to_excel(excel_path, index=False)
             print(f"Archivo Excel guardado en {excel_path}")
         
         if format_type == "csv" or format_type == "both":
@@ -4,11 +4,19 @@ en las exportaciones a diferentes formatos.
 """
 
 from typing import Dict, List, Any, Tuple, Optional
+from dataclasses import dataclass
+import copy
+import io
 import logging
+import math
+import os
+import re
 from pathlib import Path
 import numpy as np
 from collections import defaultdict
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Hacer sklearn opcional
 try:
@@ -18,15 +26,204 @@ except ImportError:
     SKLEARN_AVAILABLE = False
     KMeans = None
 
+# scipy opcional: KD-tree para limitar las relaciones espaciales a vecinos cercanos
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    cKDTree = None
+
+# numba opcional: compila los predicados numéricos de detección de tablas
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Sin numba las funciones se ejecutan como Python normal."""
+        def decorator(func):
+            return func
+        return decorator
+
 logger = logging.getLogger(__name__)
 
+# Relaciones espaciales en el orden en que las evalúa _determine_spatial_relationship
+SPATIAL_RELATIONSHIPS = (
+    "horizontally_aligned",
+    "vertically_aligned",
+    "above",
+    "below",
+    "left_of",
+    "right_of",
+)
+_SPATIAL_NAMES = np.array(SPATIAL_RELATIONSHIPS, dtype=object)
+
+# Tabla de relaciones indexada por [estado_y, estado_x]; el estado de un
+# desplazamiento d respecto a la tolerancia t es:
+#   0: d < -t   1: d == -t   2: |d| < t   3: d == t   4: d > t
+# Reproduce el orden de prioridad de _determine_spatial_relationship
+# (-1 = sin relación).
+_SPATIAL_LUT = np.array([
+    # x:  <-t  ==-t  |d|<t  ==t  >t
+    [2, 2, 1, 2, 2],      # y < -t: above
+    [4, -1, 1, -1, 5],    # y == -t
+    [0, 0, 0, 0, 0],      # |y| < t: horizontally_aligned
+    [4, -1, 1, -1, 5],    # y == t
+    [3, 3, 1, 3, 3],      # y > t: below
+], dtype=np.int8)
+
+# Registro numérico de un elemento; float64 para no alterar los redondeos y
+# comparaciones de los detectores respecto a las coordenadas originales
+_ELEMENT_DTYPE = np.dtype([("x0", "f8"), ("y0", "f8"), ("x1", "f8"), ("y1", "f8"), ("fs", "f8")])
+
+# Prefijos que marcan un elemento de lista
+_BULLET_PREFIXES = ("•", "-", "*")
+
+@dataclass(slots=True)
+class PageArrays:
+    """Elementos de una página en arrays paralelos (struct-of-arrays).
+    
+    Se construye una vez por página para que los detectores trabajen sobre
+    arrays contiguos en lugar de desempaquetar el dict de cada elemento.
+    """
+    elements: List[Dict]
+    bboxes: List[Dict]          # element.get("bbox", {}) resuelto una sola vez
+    has_bbox: np.ndarray        # bool
+    x0: np.ndarray              # float64
+    y0: np.ndarray
+    x1: np.ndarray
+    y1: np.ndarray
+    font_size: np.ndarray       # float64, 11 si el elemento no lo indica
+    has_font_size: np.ndarray   # bool, el elemento indica un tamaño no nulo
+    text: List[str]             # texto sin espacios en los extremos
+    # Propiedades del texto calculadas una sola vez para todos los clasificadores
+    text_len: np.ndarray        # int32
+    is_upper: np.ndarray        # bool, text.isupper()
+    is_title: np.ndarray        # bool, text.istitle()
+    starts_bullet: np.ndarray   # bool, empieza por "•", "-" o "*"
+    
+    @classmethod
+    def from_elements(cls, elements: List[Dict]) -> "PageArrays":
+        n = len(elements)
+        texts = [element.get("text", "").strip() for element in elements]
+        bboxes = [element.get("bbox", {}) for element in elements]
+        # Un único fromiter sin listas intermedias; los campos se copian a
+        # arrays contiguos porque las vistas de un array estructurado tienen stride
+        records = np.fromiter(
+            ((bbox.get("x0", 0), bbox.get("y0", 0), bbox.get("x1", 0), bbox.get("y1", 0),
+              element.get("font_size", 11)) if bbox else (0, 0, 0, 0, element.get("font_size", 11))
+             for element, bbox in zip(elements, bboxes)),
+            dtype=_ELEMENT_DTYPE, count=n)
+        return cls(
+            elements=elements,
+            bboxes=bboxes,
+            has_bbox=np.fromiter((bool(bbox) for bbox in bboxes), dtype=bool, count=n),
+            x0=np.ascontiguousarray(records["x0"]),
+            y0=np.ascontiguousarray(records["y0"]),
+            x1=np.ascontiguousarray(records["x1"]),
+            y1=np.ascontiguousarray(records["y1"]),
+            font_size=np.ascontiguousarray(records["fs"]),
+            has_font_size=np.fromiter((bool(element.get("font_size")) for element in elements),
+                                      dtype=bool, count=n),
+            text=texts,
+            text_len=np.fromiter(map(len, texts), dtype=np.int32, count=n),
+            is_upper=np.fromiter(map(str.isupper, texts), dtype=bool, count=n),
+            is_title=np.fromiter(map(str.istitle, texts), dtype=bool, count=n),
+            starts_bullet=np.fromiter((text.startswith(_BULLET_PREFIXES) for text in texts),
+                                      dtype=bool, count=n),
+        )
+
+@njit(cache=True, nogil=True)
+def _regular_spacing(x_positions: np.ndarray) -> bool:
+    """Núcleo de LayoutAnalyzer._has_regular_spacing sobre un array float64."""
+    n_gaps = x_positions.shape[0] - 1
+    if n_gaps < 1:
+        return False
+    
+    total = 0.0
+    for i in range(n_gaps):
+        total += x_positions[i + 1] - x_positions[i]
+    avg_gap = total / n_gaps
+    
+    regular_gaps = 0
+    for i in range(n_gaps):
+        if abs((x_positions[i + 1] - x_positions[i]) - avg_gap) < avg_gap * 0.5:
+            regular_gaps += 1
+    return regular_gaps >= n_gaps * 0.6
+
+@njit(cache=True, nogil=True)
+def _column_alignment(current_x: np.ndarray, reference_x: np.ndarray, tolerance: float) -> bool:
+    """Núcleo de LayoutAnalyzer._check_column_alignment sobre arrays float64."""
+    n_current = current_x.shape[0]
+    n_reference = reference_x.shape[0]
+    if n_current == 0 or n_reference == 0:
+        return False
+    
+    aligned_columns = 0
+    for i in range(n_current):
+        for j in range(n_reference):
+            if abs(current_x[i] - reference_x[j]) <= tolerance:
+                aligned_columns += 1
+                break
+    return aligned_columns >= min(n_current, n_reference) * 0.5
+
+@njit(cache=True, nogil=True)
+def _line_order(x_positions: np.ndarray, y_positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Ordena elementos por línea de 20px y posición X; devuelve el orden y los cortes de línea.
+    
+    Equivale a np.lexsort((x, trunc(y / 20))): dos argsort estables en lugar de una
+    clave compuesta, que desempataría mal las X con decimales.
+    """
+    buckets = np.trunc(y_positions / 20)
+    by_x = np.argsort(x_positions, kind="mergesort")
+    order = by_x[np.argsort(buckets[by_x], kind="mergesort")]
+    line_starts = np.flatnonzero(np.diff(buckets[order])) + 1
+    return order, line_starts
+
+# Un KMeans por hilo: se reutiliza entre páginas cambiando solo n_clusters
+_KMEANS_LOCAL = threading.local()
+
+def _get_column_kmeans(n_clusters: int) -> "KMeans":
+    """Devuelve el KMeans del hilo actual configurado para n_clusters."""
+    kmeans = getattr(_KMEANS_LOCAL, "kmeans", None)
+    if kmeans is None:
+        # Datos 1-D con k <= 3: una sola inicialización y Elkan bastan
+        kmeans = KMeans(n_clusters=n_clusters, n_init=1, max_iter=20, tol=1e-2,
+                        algorithm="elkan", random_state=42)
+        _KMEANS_LOCAL.kmeans = kmeans
+    return kmeans.set_params(n_clusters=n_clusters)
+
+def _segment_positions(positions: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Agrupa posiciones 1-D cortando en los n_clusters - 1 huecos más grandes.
+    
+    Devuelve la etiqueta de segmento de cada posición (0 = más a la izquierda).
+    """
+    sorted_positions = np.sort(positions)
+    gaps = np.diff(sorted_positions)
+    cut_indices = np.sort(np.argpartition(gaps, gaps.size - (n_clusters - 1))[gaps.size - (n_clusters - 1):])
+    # Cada corte queda en el punto medio del hueco
+    split_points = (sorted_positions[cut_indices] + sorted_positions[cut_indices + 1]) / 2
+    return np.searchsorted(split_points, positions)
+
 class LayoutAnalyzer:
     """Analizador de layout para preservar estructura visual en exports."""
     
     def __init__(self):
         self.min_font_size_header = 12
         self.column_threshold = 50  # Pixeles para detectar columnas
+        self.max_columns = 3
+        # KMeans (sklearn) solo si se pide explícitamente; por defecto las
+        # columnas se separan por los mayores huecos entre posiciones X
+        self.use_kmeans_columns = False
         self.line_height_threshold = 20  # Pixeles para detectar espaciado
+        # En páginas con más elementos solo se relacionan vecinos a menos de
+        # max_relationship_distance (KD-tree) en lugar de todos los pares
+        self.kdtree_min_elements = 200
+        self.max_relationship_distance = 200  # Pixeles
+        # Con más páginas que esto, cada página se analiza en su propio hilo
+        self.parallel_min_pages = 4
         
     def analyze_document_layout(self, content: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -58,10 +255,14 @@ class LayoutAnalyzer:
             # Agrupa elementos por página
             pages = self._group_by_page(elements)
             
-            # Analiza cada página
-            for page_num, page_elements in pages.items():
-                page_analysis = self._analyze_page_layout(page_elements)
-                structure["pages"][page_num] = page_analysis
+            # Analiza cada página (en paralelo si el documento es largo; las
+            # páginas son independientes y NumPy/numba liberan el GIL)
+            if len(pages) > self.parallel_min_pages:
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    page_analyses = list(executor.map(self._analyze_page_layout, pages.values()))
+            else:
+                page_analyses = [self._analyze_page_layout(page_elements) for page_elements in pages.values()]
+            structure["pages"] = dict(zip(pages.keys(), page_analyses))
             
             # Análisis global
             structure["global_structure"] = self._analyze_global_structure(structure["pages"])
@@ -97,153 +298,184 @@ class LayoutAnalyzer:
         if not elements:
             return analysis
         
+        # Convierte los elementos a arrays paralelos una sola vez
+        page = PageArrays.from_elements(elements)
+        
         # Extrae coordenadas y texto
-        coordinates = self._extract_coordinates(elements)
+        coordinates = self._extract_coordinates(page)
         
         # Detecta columnas
-        analysis["columns"] = self._detect_columns(coordinates)
+        analysis["columns"] = self._detect_columns(page, coordinates)
         
-        # Detecta headers por tamaño de fuente
-        analysis["headers"] = self._detect_headers(elements)
+        # Detecta headers por tamaño de fuente y clasifica bloques de texto
+        analysis["headers"], analysis["text_blocks"] = self._scan_page(page)
         
         # Detecta tablas por alineación
-        analysis["tables"] = self._detect_tables_by_alignment(elements)
-        
-        # Clasifica bloques de texto
-        analysis["text_blocks"] = self._classify_text_blocks(elements)
+        analysis["tables"] = self._detect_tables_by_alignment(page)
         
         # Calcula bounding box de la página
-        analysis["bounding_box"] = self._calculate_page_bounds(coordinates)
+        analysis["bounding_box"] = self._calculate_page_bounds(page)
         
         # Analiza relaciones espaciales
-        analysis["spatial_relationships"] = self._analyze_spatial_relationships(elements)
+        analysis["spatial_relationships"] = self._analyze_spatial_relationships(page)
         
         return analysis
     
-    def _extract_coordinates(self, elements: List[Dict]) -> List[Dict]:
-        """Extrae coordenadas de elementos."""
+    def _extract_coordinates(self, page: PageArrays) -> List[Dict]:
+        """Extrae coordenadas de los elementos con bbox."""
         coordinates = []
-        for element in elements:
-            bbox = element.get("bbox", {})
-            if bbox:
-                coordinates.append({
-                    "x0": bbox.get("x0", 0),
-                    "y0": bbox.get("y0", 0),
-                    "x1": bbox.get("x1", 0),
-                    "y1": bbox.get("y1", 0),
-                    "text": element.get("text", ""),
-                    "font_size": element.get("font_size", 11),
-                    "element": element
-                })
+        for i in np.flatnonzero(page.has_bbox).tolist():
+            element = page.elements[i]
+            bbox = page.bboxes[i]
+            coordinates.append({
+                "x0": bbox.get("x0", 0),
+                "y0": bbox.get("y0", 0),
+                "x1": bbox.get("x1", 0),
+                "y1": bbox.get("y1", 0),
+                "text": element.get("text", ""),
+                "font_size": element.get("font_size", 11),
+                "element": element
+            })
         return coordinates
     
-    def _detect_columns(self, coordinates: List[Dict]) -> List[Dict]:
-        """Detecta columnas usando clustering de posiciones X."""
+    def _detect_columns(self, page: PageArrays, coordinates: List[Dict]) -> List[Dict]:
+        """Detecta columnas usando clustering de posiciones X.
+        
+        coordinates contiene un dict por cada elemento con bbox, en el mismo
+        orden que page, y es lo que se devuelve en "elements" de cada columna.
+        """
         if not coordinates:
             return []
+        if len(coordinates) < 2:
+            # Un solo elemento no puede formar varias columnas
+            return [{"x_start": 0, "x_end": 600, "elements": coordinates}]
         
         try:
-            # Extrae posiciones X de inicio
-            x_positions = np.array([[coord["x0"]] for coord in coordinates])
+            # Extrae posiciones X de inicio y fin de los elementos con bbox
+            bbox_indices = np.flatnonzero(page.has_bbox)
+            x_starts = page.x0[bbox_indices]
+            x_ends = page.x1[bbox_indices]
             
-            # Usa clustering para detectar columnas si sklearn está disponible
-            if SKLEARN_AVAILABLE:
-                n_clusters = min(3, len(set(coord["x0"] for coord in coordinates)))
-                if n_clusters < 2:
-                    return [{"x_start": 0, "x_end": 600, "elements": coordinates}]
-                
-                kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-                clusters = kmeans.fit_predict(x_positions)
-                
-                # Organiza por columnas
-                columns = []
-                for i in range(n_clusters):
-                    cluster_coords = [coord for j, coord in enumerate(coordinates) if clusters[j] == i]
-                    if cluster_coords:
-                        x_start = min(coord["x0"] for coord in cluster_coords)
-                        x_end = max(coord["x1"] for coord in cluster_coords)
-                        columns.append({
-                            "x_start": x_start,
-                            "x_end": x_end,
-                            "elements": cluster_coords
-                        })
-                
-                # Ordena columnas por posición X
-                columns.sort(key=lambda x: x["x_start"])
-                return columns
-            else:
-                # Fallback simple sin sklearn
-                logger.warning("sklearn not available, using simple column detection")
+            n_clusters = min(self.max_columns, np.unique(x_starts).size)
+            if n_clusters < 2:
                 return [{"x_start": 0, "x_end": 600, "elements": coordinates}]
+            
+            if self.use_kmeans_columns and SKLEARN_AVAILABLE:
+                clusters = _get_column_kmeans(n_clusters).fit_predict(x_starts.reshape(-1, 1))
+            else:
+                # En 1-D basta con cortar en los huecos más grandes
+                clusters = _segment_positions(x_starts, n_clusters)
+            
+            # Organiza por columnas
+            columns = []
+            for i in range(n_clusters):
+                members = np.flatnonzero(clusters == i)
+                if members.size:
+                    cluster_coords = [coordinates[j] for j in members.tolist()]
+                    x_start = cluster_coords[int(np.argmin(x_starts[members]))]["x0"]
+                    x_end = cluster_coords[int(np.argmax(x_ends[members]))]["x1"]
+                    columns.append({
+                        "x_start": x_start,
+                        "x_end": x_end,
+                        "elements": cluster_coords
+                    })
+            
+            # Ordena columnas por posición X
+            columns.sort(key=lambda x: x["x_start"])
+            return columns
                 
         except Exception as e:
             logger.error(f"Error detecting columns: {str(e)}")
             return [{"x_start": 0, "x_end": 600, "elements": coordinates}]
     
-    def _detect_headers(self, elements: List[Dict]) -> List[Dict]:
-        """Detecta headers por tamaño de fuente y posición."""
+    def _scan_page(self, page: PageArrays) -> Tuple[List[Dict], List[Dict]]:
+        """Detecta headers y clasifica bloques de texto en un único recorrido.
+        
+        Returns:
+            Tupla (headers, text_blocks)
+        """
         headers = []
+        text_blocks = []
+        if not page.elements:
+            return headers, text_blocks
+        
+        font_sizes = page.font_size
+        texts = page.text
+        text_lens = page.text_len
         
         # Calcula tamaño de fuente promedio
-        font_sizes = [elem.get("font_size", 11) for elem in elements if elem.get("font_size")]
-        avg_font_size = np.mean(font_sizes) if font_sizes else 11
+        avg_font_size = font_sizes[page.has_font_size].mean() if page.has_font_size.any() else 11
         
-        for element in elements:
-            font_size = element.get("font_size", 11)
-            text = element.get("text", "").strip()
+        # Criterios para header: fuente más grande y texto corto no vacío
+        header_mask = ((font_sizes > avg_font_size * 1.2) & (text_lens < 100) & (text_lens > 0)).tolist()
+        levels = self._determine_header_levels(font_sizes / avg_font_size).tolist()
+        block_types = self._determine_block_types(font_sizes, text_lens, page.is_upper,
+                                                  page.is_title, page.starts_bullet).tolist()
+        
+        for i, text in enumerate(texts):
+            if not text:
+                continue
             
-            # Criterios para header
-            is_larger_font = font_size > avg_font_size * 1.2
-            is_short_text = len(text) < 100
-            is_capitalized = text.isupper() or text.istitle()
+            element = page.elements[i]
+            font_size = element.get("font_size", 11)
+            bbox = page.bboxes[i]
             
-            if is_larger_font and is_short_text and text:
+            if header_mask[i]:
                 headers.append({
                     "text": text,
                     "font_size": font_size,
-                    "level": self._determine_header_level(font_size, avg_font_size),
-                    "bbox": element.get("bbox", {}),
+                    "level": levels[i],
+                    "bbox": bbox,
                     "element": element
                 })
+            
+            text_blocks.append({
+                "text": text,
+                "type": block_types[i],
+                "bbox": bbox,
+                "font_size": font_size,
+                "element": element
+            })
         
-        return headers
-    
-    def _determine_header_level(self, font_size: float, avg_font_size: float) -> int:
-        """Determina el nivel de header basado en tamaño de fuente."""
-        ratio = font_size / avg_font_size
-        if ratio > 2.0:
-            return 1
-        elif ratio > 1.5:
-            return 2
-        elif ratio > 1.2:
-            return 3
-        else:
-            return 4
+        return headers, text_blocks
     
-    def _detect_tables_by_alignment(self, elements: List[Dict]) -> List[Dict]:
+    def _detect_headers(self, page: PageArrays) -> List[Dict]:
+        """Detecta headers por tamaño de fuente y posición."""
+        return self._scan_page(page)[0]
+    
+    def _determine_header_levels(self, ratios: np.ndarray) -> np.ndarray:
+        """Determina el nivel de header según la proporción respecto a la fuente promedio."""
+        return np.select([ratios > 2.0, ratios > 1.5, ratios > 1.2], [1, 2, 3], default=4)
+    
+    def _detect_tables_by_alignment(self, page: PageArrays) -> List[Dict]:
         """Detecta tablas por alineación de texto con algoritmo mejorado."""
         tables = []
-        
-        # Agrupa elementos por línea Y con tolerancia más precisa
-        y_groups = defaultdict(list)
-        for element in elements:
-            bbox = element.get("bbox", {})
-            if bbox:
-                y_pos = round(bbox.get("y0", 0) / 5) * 5  # Redondea a 5px para mayor precisión
-                y_groups[y_pos].append(element)
-        
-        # Busca filas con múltiples elementos alineados
+        indices = np.flatnonzero(page.has_bbox)
+        # Una tabla necesita al menos 2 filas de 2 elementos
+        if indices.size < 4:
+            return tables
+        
+        # Agrupa elementos por línea Y redondeando a 5px (rint redondea igual que round)
+        buckets = np.rint(page.y0[indices] / 5).astype(np.int64)
+        
+        # Ordena por línea y, dentro de cada línea, por posición X (lexsort es estable)
+        order = np.lexsort((page.x0[indices], buckets))
+        sorted_buckets = buckets[order]
+        boundaries = np.flatnonzero(np.diff(sorted_buckets)) + 1
+        starts = np.concatenate(([0], boundaries)).tolist()
+        y_groups = np.split(indices[order], boundaries)
+        
+        # Busca filas con múltiples elementos alineados (ya quedan ordenadas por Y)
         potential_rows = []
-        for y_pos, elements_in_row in y_groups.items():
-            if len(elements_in_row) >= 2:  # Al menos 2 elementos para ser fila
-                # Ordena por posición X
-                elements_in_row.sort(key=lambda x: x.get("bbox", {}).get("x0", 0))
-                
+        for start, row_indices in zip(starts, y_groups):
+            if row_indices.size >= 2:  # Al menos 2 elementos para ser fila
                 # Verifica si los elementos están distribuidos uniformemente (indicativo de tabla)
-                x_positions = [elem.get("bbox", {}).get("x0", 0) for elem in elements_in_row]
+                x_positions = page.x0[row_indices]
                 if self._has_regular_spacing(x_positions):
+                    elements_in_row = [page.elements[i] for i in row_indices.tolist()]
                     potential_rows.append({
-                        "y_pos": y_pos,
+                        "y_pos": int(sorted_buckets[start]) * 5,
+                        "indices": row_indices,
                         "elements": elements_in_row,
                         "columns": len(elements_in_row),
                         "x_positions": x_positions
@@ -251,7 +483,6 @@ class LayoutAnalyzer:
         
         # Agrupa filas consecutivas en tablas con mejor detección
         if potential_rows:
-            potential_rows.sort(key=lambda x: x["y_pos"])
             current_table = [potential_rows[0]]
             expected_columns = potential_rows[0]["columns"]
             
@@ -272,50 +503,34 @@ class LayoutAnalyzer:
                 else:
                     # Finaliza tabla actual si tiene suficientes filas
                     if len(current_table) >= 2:
-                        tables.append(self._create_enhanced_table_structure(current_table))
+                        tables.append(self._create_enhanced_table_structure(current_table, page))
                     current_table = [current_row]
                     expected_columns = current_row["columns"]
             
             # Añade la última tabla
             if len(current_table) >= 2:
-                tables.append(self._create_enhanced_table_structure(current_table))
+                tables.append(self._create_enhanced_table_structure(current_table, page))
         
         return tables
     
-    def _has_regular_spacing(self, x_positions: List[float]) -> bool:
-        """Verifica si las posiciones X tienen espaciado regular (indicativo de tabla)."""
-        if len(x_positions) < 2:
-            return False
+    def _has_regular_spacing(self, x_positions: np.ndarray) -> bool:
+        """Verifica si las posiciones X tienen espaciado regular (indicativo de tabla).
         
-        gaps = [x_positions[i+1] - x_positions[i] for i in range(len(x_positions) - 1)]
-        if not gaps:
-            return False
-        
-        avg_gap = sum(gaps) / len(gaps)
-        # Verifica si la mayoría de gaps están cerca del promedio
-        regular_gaps = sum(1 for gap in gaps if abs(gap - avg_gap) < avg_gap * 0.5)
-        return regular_gaps >= len(gaps) * 0.6  # 60% de los gaps deben ser regulares
+        Al menos el 60% de los gaps deben estar cerca del gap promedio.
+        """
+        return bool(_regular_spacing(np.asarray(x_positions, dtype=np.float64)))
     
-    def _check_column_alignment(self, current_x: List[float], reference_x: List[float]) -> bool:
-        """Verifica si las columnas están alineadas entre filas."""
-        if not current_x or not reference_x:
-            return False
-        
-        # Permite cierta tolerancia en la alineación
-        tolerance = 20  # píxeles
+    def _check_column_alignment(self, current_x: np.ndarray, reference_x: np.ndarray) -> bool:
+        """Verifica si las columnas están alineadas entre filas.
         
-        # Compara posiciones con la fila de referencia
-        aligned_columns = 0
-        for x1 in current_x:
-            for x2 in reference_x:
-                if abs(x1 - x2) <= tolerance:
-                    aligned_columns += 1
-                    break
-        
-        # Al menos 50% de las columnas deben estar alineadas
-        return aligned_columns >= min(len(current_x), len(reference_x)) * 0.5
+        Al menos el 50% de las columnas deben coincidir (±20 píxeles) con la fila de referencia.
+        """
+        tolerance = 20.0  # píxeles
+        return bool(_column_alignment(np.asarray(current_x, dtype=np.float64),
+                                      np.asarray(reference_x, dtype=np.float64),
+                                      tolerance))
     
-    def _create_enhanced_table_structure(self, rows: List[Dict]) -> Dict[str, Any]:
+    def _create_enhanced_table_structure(self, rows: List[Dict], page: PageArrays) -> Dict[str, Any]:
         """Crea estructura de tabla mejorada con detección de celdas combinadas."""
         table_data = []
         max_columns = max(len(row["elements"]) for row in rows)
@@ -341,11 +556,8 @@ class LayoutAnalyzer:
             table_data.append(row_data)
         
         # Calcular bounding box de la tabla completa
-        all_elements = []
-        for row in rows:
-            all_elements.extend(row["elements"])
-        
-        bbox = self._calculate_table_bbox_enhanced(all_elements)
+        table_indices = np.concatenate([row["indices"] for row in rows])
+        bbox = self._bbox_from_arrays(page, table_indices, {"x0": 0, "y0": 0, "x1": 0, "y1": 0})
         
         return {
             "data": table_data,
@@ -356,28 +568,22 @@ class LayoutAnalyzer:
             "confidence": self._calculate_table_confidence(rows)
         }
     
-    def _calculate_table_bbox_enhanced(self, elements: List[Dict]) -> Dict[str, float]:
-        """Calcula bounding box mejorado de una tabla."""
-        if not elements:
-            return {"x0": 0, "y0": 0, "x1": 0, "y1": 0}
-        
-        x_coords = []
-        y_coords = []
+    def _bbox_from_arrays(self, page: PageArrays, indices: np.ndarray,
+                          default: Dict[str, float]) -> Dict[str, float]:
+        """Bounding box que envuelve los elementos indices de page.
         
-        for elem in elements:
-            bbox = elem.get("bbox", {})
-            if bbox:
-                x_coords.extend([bbox.get("x0", 0), bbox.get("x1", 0)])
-                y_coords.extend([bbox.get("y0", 0), bbox.get("y1", 0)])
-        
-        if not x_coords or not y_coords:
-            return {"x0": 0, "y0": 0, "x1": 0, "y1": 0}
+        Las reducciones se hacen sobre los arrays float64; con argmin/argmax se
+        devuelve el valor original del bbox (int o float). Si no hay
+        elementos se devuelve default.
+        """
+        if indices.size == 0:
+            return dict(default)
         
         return {
-            "x0": min(x_coords),
-            "y0": min(y_coords),
-            "x1": max(x_coords),
-            "y1": max(y_coords)
+            "x0": page.bboxes[indices[np.argmin(page.x0[indices])]].get("x0", 0),
+            "y0": page.bboxes[indices[np.argmin(page.y0[indices])]].get("y0", 0),
+            "x1": page.bboxes[indices[np.argmax(page.x1[indices])]].get("x1", 0),
+            "y1": page.bboxes[indices[np.argmax(page.y1[indices])]].get("y1", 0),
         }
     
     def _calculate_table_confidence(self, rows: List[Dict]) -> float:
@@ -406,107 +612,86 @@ class LayoutAnalyzer:
         
         return min(confidence, 0.95)
     
-    def _create_table_structure(self, rows: List[Dict]) -> Dict[str, Any]:
-        """Crea estructura de tabla a partir de filas detectadas."""
-        table_data = []
-        
-        for row in rows:
-            row_data = [elem.get("text", "").strip() for elem in row["elements"]]
-            table_data.append(row_data)
-        
-        return {
-            "data": table_data,
-            "rows": len(table_data),
-            "cols": max(len(row) for row in table_data) if table_data else 0,
-            "bbox": self._calculate_table_bbox(rows)
-        }
-    
-    def _calculate_table_bbox(self, rows: List[Dict]) -> Dict[str, float]:
-        """Calcula bounding box de una tabla."""
-        all_elements = []
-        for row in rows:
-            all_elements.extend(row["elements"])
-        
-        if not all_elements:
-            return {"x0": 0, "y0": 0, "x1": 0, "y1": 0}
-        
-        x0 = min(elem.get("bbox", {}).get("x0", 0) for elem in all_elements)
-        y0 = min(elem.get("bbox", {}).get("y0", 0) for elem in all_elements)
-        x1 = max(elem.get("bbox", {}).get("x1", 0) for elem in all_elements)
-        y1 = max(elem.get("bbox", {}).get("y1", 0) for elem in all_elements)
-        
-        return {"x0": x0, "y0": y0, "x1": x1, "y1": y1}
-    
-    def _classify_text_blocks(self, elements: List[Dict]) -> List[Dict]:
+    def _classify_text_blocks(self, page: PageArrays) -> List[Dict]:
         """Clasifica bloques de texto por tipo."""
-        text_blocks = []
-        
-        for element in elements:
-            text = element.get("text", "").strip()
-            if not text:
-                continue
-            
-            block_type = self._determine_block_type(element)
-            
-            text_blocks.append({
-                "text": text,
-                "type": block_type,
-                "bbox": element.get("bbox", {}),
-                "font_size": element.get("font_size", 11),
-                "element": element
-            })
-        
-        return text_blocks
-    
-    def _determine_block_type(self, element: Dict) -> str:
-        """Determina el tipo de bloque de texto."""
-        text = element.get("text", "").strip()
-        font_size = element.get("font_size", 11)
-        
-        if font_size > 14:
-            return "header"
-        elif len(text) < 50 and (text.isupper() or text.istitle()):
-            return "title"
-        elif text.startswith("•") or text.startswith("-") or text.startswith("*"):
-            return "list_item"
-        elif len(text) > 200:
-            return "paragraph"
-        else:
-            return "text"
+        return self._scan_page(page)[1]
     
-    def _calculate_page_bounds(self, coordinates: List[Dict]) -> Dict[str, float]:
+    def _determine_block_types(self, font_sizes: np.ndarray, text_lens: np.ndarray,
+                               is_upper: np.ndarray, is_title: np.ndarray,
+                               starts_bullet: np.ndarray) -> np.ndarray:
+        """Determina el tipo de cada bloque de texto de la página en una sola pasada."""
+        return np.select(
+            [font_sizes > 14,
+             (text_lens < 50) & (is_upper | is_title),
+             starts_bullet,
+             text_lens > 200],
+            ["header", "title", "list_item", "paragraph"],
+            default="text",
+        )
+    
+    def _calculate_page_bounds(self, page: PageArrays) -> Dict[str, float]:
         """Calcula los límites de la página."""
-        if not coordinates:
-            return {"x0": 0, "y0": 0, "x1": 600, "y1": 800}
-        
-        x0 = min(coord["x0"] for coord in coordinates)
-        y0 = min(coord["y0"] for coord in coordinates)
-        x1 = max(coord["x1"] for coord in coordinates)
-        y1 = max(coord["y1"] for coord in coordinates)
-        
-        return {"x0": x0, "y0": y0, "x1": x1, "y1": y1}
+        return self._bbox_from_arrays(page, np.flatnonzero(page.has_bbox),
+                                      {"x0": 0, "y0": 0, "x1": 600, "y1": 800})
     
-    def _analyze_spatial_relationships(self, elements: List[Dict]) -> List[Dict]:
+    def _analyze_spatial_relationships(self, page: PageArrays) -> List[Dict]:
         """Analiza relaciones espaciales entre elementos."""
         relationships = []
         
-        for i, elem1 in enumerate(elements):
-            for j, elem2 in enumerate(elements[i+1:], i+1):
-                bbox1 = elem1.get("bbox", {})
-                bbox2 = elem2.get("bbox", {})
-                
-                if bbox1 and bbox2:
-                    relationship = self._determine_spatial_relationship(bbox1, bbox2)
-                    if relationship:
-                        relationships.append({
-                            "element1_index": i,
-                            "element2_index": j,
-                            "relationship": relationship,
-                            "distance": self._calculate_distance(bbox1, bbox2)
-                        })
+        # Centros de cada elemento (los que no tienen bbox se descartan)
+        indices = np.flatnonzero(page.has_bbox)
+        if indices.size < 2:
+            return relationships
+        
+        cx = (page.x0[indices] + page.x1[indices]) / 2
+        cy = (page.y0[indices] + page.y1[indices]) / 2
+        
+        if SCIPY_AVAILABLE and indices.size > self.kdtree_min_elements:
+            # Solo pares de elementos cercanos: O(N log N) en lugar de O(N²)
+            tree = cKDTree(np.column_stack((cx, cy)))
+            pairs = tree.query_pairs(r=self.max_relationship_distance, output_type='ndarray')
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+            first, second = pairs[:, 0], pairs[:, 1]
+        else:
+            # Todos los pares (i, j) con i < j, en el mismo orden que el doble bucle
+            first, second = np.triu_indices(indices.size, 1)
+        
+        dx = cx[first] - cx[second]
+        dy = cy[first] - cy[second]
+        
+        labels = self._label_spatial_relationships(dx, dy)
+        related = np.flatnonzero(labels >= 0)
+        
+        distances = np.hypot(dx[related], dy[related]).tolist()
+        names = _SPATIAL_NAMES[labels[related]].tolist()
+        element1 = indices[first[related]].tolist()
+        element2 = indices[second[related]].tolist()
+        
+        for i, j, relationship, distance in zip(element1, element2, names, distances):
+            relationships.append({
+                "element1_index": i,
+                "element2_index": j,
+                "relationship": relationship,
+                "distance": distance
+            })
         
         return relationships
     
+    def _label_spatial_relationships(self, dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de _determine_spatial_relationship: devuelve, para cada par,
+        el índice en SPATIAL_RELATIONSHIPS o -1 si no hay relación.
+        
+        Sin ramas: cada desplazamiento se reduce a su estado (0-4) respecto a la
+        tolerancia y la relación se lee de _SPATIAL_LUT.
+        """
+        tolerance = 5
+        y_state = ((dy >= -tolerance).view(np.int8) + (dy > -tolerance).view(np.int8)
+                   + (dy >= tolerance).view(np.int8) + (dy > tolerance).view(np.int8))
+        x_state = ((dx >= -tolerance).view(np.int8) + (dx > -tolerance).view(np.int8)
+                   + (dx >= tolerance).view(np.int8) + (dx > tolerance).view(np.int8))
+        return _SPATIAL_LUT[y_state, x_state]
+    
     def _determine_spatial_relationship(self, bbox1: Dict, bbox2: Dict) -> Optional[str]:
         """Determina la relación espacial entre dos elementos."""
         # Calcula centros
@@ -541,7 +726,8 @@ class LayoutAnalyzer:
         center2_x = (bbox2["x0"] + bbox2["x1"]) / 2
         center2_y = (bbox2["y0"] + bbox2["y1"]) / 2
         
-        return np.sqrt((center1_x - center2_x)**2 + (center1_y - center2_y)**2)
+        # math.hypot evita el coste de despachar un ufunc de NumPy para un escalar
+        return math.hypot(center1_x - center2_x, center1_y - center2_y)
     
     def _analyze_global_structure(self, pages: Dict) -> Dict[str, Any]:
         """Analiza estructura global del documento."""
@@ -556,30 +742,27 @@ class LayoutAnalyzer:
         if not pages:
             return structure
         
-        # Analiza columnas
-        column_counts = []
+        # Acumula columnas y headers en una sola pasada por las páginas
+        total_columns = 0
+        header_count = 0
+        levels = set()
         for page_data in pages.values():
-            column_count = len(page_data.get("columns", []))
-            column_counts.append(column_count)
+            total_columns += len(page_data.get("columns", []))
+            headers = page_data.get("headers", [])
+            header_count += len(headers)
+            levels.update(header.get("level", 1) for header in headers)
         
-        if column_counts:
-            avg_columns = np.mean(column_counts)
-            structure["has_columns"] = avg_columns > 1
-            structure["column_count"] = int(np.round(avg_columns))
+        avg_columns = total_columns / len(pages)
+        structure["has_columns"] = avg_columns > 1
+        structure["column_count"] = round(avg_columns)
         
-        # Analiza headers
-        all_headers = []
-        for page_data in pages.values():
-            all_headers.extend(page_data.get("headers", []))
-        
-        if all_headers:
-            levels = set(header.get("level", 1) for header in all_headers)
-            structure["header_levels"] = sorted(list(levels))
+        if levels:
+            structure["header_levels"] = sorted(levels)
         
         # Determina tipo de documento
         if structure["has_columns"]:
             structure["document_type"] = "multi_column"
-        elif len(all_headers) > 5:
+        elif header_count > 5:
             structure["document_type"] = "structured_document"
         else:
             structure["document_type"] = "simple_document"
@@ -598,7 +781,7 @@ class LayoutAnalyzer:
                 elements = []
                 for col in columns:
                     elements.extend(col.get("elements", []))
-                elements.sort(key=lambda x: x.get("y0", 0))
+                elements = [elements[i] for i in self._order_by_y(elements)]
                 
                 for i, elem in enumerate(elements):
                     reading_order.append({
@@ -612,7 +795,7 @@ class LayoutAnalyzer:
                 order_index = 0
                 for col in columns:
                     col_elements = col.get("elements", [])
-                    col_elements.sort(key=lambda x: x.get("y0", 0))
+                    col_elements[:] = [col_elements[i] for i in self._order_by_y(col_elements)]
                     
                     for elem in col_elements:
                         reading_order.append({
@@ -624,9 +807,134 @@ class LayoutAnalyzer:
                         order_index += 1
         
         return reading_order
+    
+    def _order_by_y(self, coordinates: List[Dict]) -> List[int]:
+        """Índices que ordenan las coordenadas por y0 (estable, como list.sort)."""
+        y0 = np.fromiter((coord.get("y0", 0) for coord in coordinates), dtype=np.float64,
+                         count=len(coordinates))
+        return np.argsort(y0, kind="stable").tolist()
 
 # Funciones helper para generar exports con layout preservado
 
+# Separador entre páginas en la exportación de texto
+_PAGE_RULE = '=' * 60
+
+# Tabla para escapar HTML en una sola pasada (mismo resultado que html.escape)
+_HTML_ESCAPE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+_HTML_SPECIAL = re.compile(r'[&<>"\']').search
+# Plantilla de cada elemento posicionado: un único formateo '%' (en C) por elemento.
+# Se usa %s y no %d porque las coordenadas pueden ser float y deben salir tal cual
+_TEXT_ELEM_TPL = ('<div class="text-element" style="left: %spx; top: %spx; '
+                  'font-size: %spx; font-family: Arial;">%s</div>\n')
+
+class _Elem:
+    """Elemento con texto de una página, con los campos que usan los generadores."""
+    __slots__ = ("x0", "y0", "text", "font_size", "flags")
+    
+    def __init__(self, x0, y0, text, font_size, flags):
+        self.x0 = x0
+        self.y0 = y0
+        self.text = text
+        self.font_size = font_size
+        self.flags = flags
+
+def _page_elements(page_data: Dict) -> List[_Elem]:
+    """Recorre los elementos de todas las columnas una vez y descarta los que no tienen texto."""
+    elements = []
+    for column in page_data.get("columns", []):
+        for elem in column.get("elements", []):
+            element_data = elem.get("element", {})
+            text = element_data.get("text", "").strip()
+            if text:
+                elements.append(_Elem(elem.get("x0", 0), elem.get("y0", 0), text,
+                                      element_data.get("font_size", 11),
+                                      element_data.get("flags", 0)))
+    return elements
+
+def _fast_escape(text: str) -> str:
+    """Escapa HTML como html.escape, sin recorrer el texto si no hay caracteres especiales."""
+    if not _HTML_SPECIAL(text):
+        return text
+    return text.translate(_HTML_ESCAPE)
+
+def _cell_html(cell: Any) -> str:
+    """Texto escapado de una celda; los números (no bool) se convierten sin escapar."""
+    cell_type = type(cell)
+    if cell_type is int or cell_type is float:
+        return str(cell)
+    return _fast_escape(cell if cell_type is str else str(cell))
+
+def _emit_html_table(write, table_data: List[List[Any]]) -> None:
+    """Escribe las filas de una tabla HTML: la primera como header y el resto como datos."""
+    write('<tr>' + ''.join('<th>' + _cell_html(cell) + '</th>' for cell in table_data[0])
+          + '</tr>\n')
+    # Todas las filas de datos se unen en un solo string antes de escribirlas
+    write(''.join(
+        '<tr>' + ''.join('<td>' + _cell_html(cell) + '</td>' for cell in row) + '</tr>\n'
+        for row in table_data[1:]
+    ))
+
+def _render_content_fallback(content: Dict, write, use_elements: bool = True) -> None:
+    """Escribe título, elementos o texto plano y tablas de content cuando no hay layout.
+    
+    Con use_elements=False se ignoran los elementos estructurados y siempre se usa el texto.
+    """
+    # Procesar título si existe
+    if "title" in content and content["title"]:
+        title_escaped = _fast_escape(content["title"])
+        write(f'<h1 style="margin-bottom: 20px; color: #333;">{title_escaped}</h1>\n')
+    
+    # Procesar elementos estructurados si existen
+    if use_elements and "elements" in content and content["elements"]:
+        for element in content["elements"]:
+            if isinstance(element, dict) and "content" in element:
+                element_content = element["content"]
+                if isinstance(element_content, str):
+                    text_escaped = _fast_escape(element_content).replace('\n', '<br>')
+                    write(f'<div style="margin-bottom: 10px;">{text_escaped}</div>\n')
+                elif isinstance(element_content, dict):
+                    # Manejar contenido estructurado de PyMuPDF
+                    if "blocks" in element_content:
+                        for block in element_content["blocks"]:
+                            if "lines" in block:
+                                for line in block["lines"]:
+                                    if "spans" in line:
+                                        line_text = ""
+                                        for span in line["spans"]:
+                                            span_text = span.get("text", "")
+                                            if span_text.strip():
+                                                line_text += span_text
+                                        if line_text.strip():
+                                            text_escaped = _fast_escape(line_text)
+                                            write(f'<div style="margin-bottom: 5px;">{text_escaped}</div>\n')
+    
+    # Procesar texto plano si no hay elementos estructurados
+    elif "text" in content and content["text"]:
+        # Dividir por párrafos para mejor formato; los vacíos se descartan antes de
+        # escapar y cada párrafo se escapa por separado (el escape no toca '\n')
+        for para in content["text"].split('\n\n'):
+            if para.strip():
+                para_escaped = _fast_escape(para).replace('\n', '<br>')
+                write(f'<div style="margin-bottom: 15px;">{para_escaped}</div>\n')
+    
+    # Procesar tablas
+    if "tables" in content and content["tables"]:
+        for i, table in enumerate(content["tables"]):
+            write(f'<h3>Table {i+1}</h3>\n')
+            write('<table class="table-element">\n')
+            
+            if isinstance(table, dict) and "data" in table:
+                table_data = table["data"]
+                if table_data and len(table_data) > 0:
+                    _emit_html_table(write, table_data)
+            write('</table>\n')
+
 def generate_html_with_layout(layout_analysis: Dict, content: Dict) -> str:
     """Genera HTML con posicionamiento pixel-perfect preservando el layout original."""
     css = """
@@ -687,93 +995,36 @@ def generate_html_with_layout(layout_analysis: Dict, content: Dict) -> str:
     </style>
     """
     
-    html_parts = ['<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Document Export</title>', css, '</head><body>']
+    # Las partes se escriben directamente en un buffer, una por línea
+    buffer = io.StringIO()
+    w = buffer.write
+    
+    w('<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Document Export</title>\n')
+    w(css)
+    w('\n</head><body>\n')
     
     pages = layout_analysis.get("pages", {})
     
-    html_parts.append('<div class="document-container">')
+    w('<div class="document-container">\n')
     
     # Si no hay páginas estructuradas, usar contenido básico
     if not pages:
-        html_parts.append('<div class="page" style="width: 595px; min-height: 842px;">')
-        html_parts.append('<div class="content-block">')
+        w('<div class="page" style="width: 595px; min-height: 842px;">\n')
+        w('<div class="content-block">\n')
         
         # Usar contenido del diccionario directamente
         if isinstance(content, dict):
-            import html as html_module
-            
-            # Procesar título si existe
-            if "title" in content and content["title"]:
-                title_escaped = html_module.escape(content["title"])
-                html_parts.append(f'<h1 style="margin-bottom: 20px; color: #333;">{title_escaped}</h1>')
-            
-            # Procesar elementos estructurados si existen
-            if "elements" in content and content["elements"]:
-                for element in content["elements"]:
-                    if isinstance(element, dict) and "content" in element:
-                        element_content = element["content"]
-                        if isinstance(element_content, str):
-                            text_escaped = html_module.escape(element_content)
-                            html_parts.append(f'<div style="margin-bottom: 10px;">{text_escaped.replace(chr(10), "<br>")}</div>')
-                        elif isinstance(element_content, dict):
-                            # Manejar contenido estructurado de PyMuPDF
-                            if "blocks" in element_content:
-                                for block in element_content["blocks"]:
-                                    if "lines" in block:
-                                        for line in block["lines"]:
-                                            if "spans" in line:
-                                                line_text = ""
-                                                for span in line["spans"]:
-                                                    span_text = span.get("text", "")
-                                                    if span_text.strip():
-                                                        line_text += span_text
-                                                if line_text.strip():
-                                                    text_escaped = html_module.escape(line_text)
-                                                    html_parts.append(f'<div style="margin-bottom: 5px;">{text_escaped}</div>')
-            
-            # Procesar texto plano si no hay elementos estructurados
-            elif "text" in content and content["text"]:
-                text_escaped = html_module.escape(content["text"])
-                # Dividir por párrafos para mejor formato
-                paragraphs = text_escaped.split('\n\n')
-                for para in paragraphs:
-                    if para.strip():
-                        html_parts.append(f'<div style="margin-bottom: 15px;">{para.replace(chr(10), "<br>")}</div>')
-            
-            # Procesar tablas
-            if "tables" in content and content["tables"]:
-                for i, table in enumerate(content["tables"]):
-                    html_parts.append(f'<h3>Table {i+1}</h3>')
-                    html_parts.append('<table class="table-element">')
-                    
-                    if isinstance(table, dict) and "data" in table:
-                        table_data = table["data"]
-                        if table_data and len(table_data) > 0:
-                            # Primera fila como header
-                            html_parts.append('<tr>')
-                            for cell in table_data[0]:
-                                cell_escaped = html_module.escape(str(cell))
-                                html_parts.append(f'<th>{cell_escaped}</th>')
-                            html_parts.append('</tr>')
-                            
-                            # Resto de filas
-                            for row in table_data[1:]:
-                                html_parts.append('<tr>')
-                                for cell in row:
-                                    cell_escaped = html_module.escape(str(cell))
-                                    html_parts.append(f'<td>{cell_escaped}</td>')
-                                html_parts.append('</tr>')
-                    html_parts.append('</table>')
+            _render_content_fallback(content, w)
             
             # Si no hay contenido procesable, mostrar mensaje
             if (not content.get("text") and not content.get("elements") and 
                 not content.get("tables") and not content.get("title")):
-                html_parts.append('<div style="color: #666; font-style: italic;">No content available for export. The document may need to be processed again.</div>')
+                w('<div style="color: #666; font-style: italic;">No content available for export. The document may need to be processed again.</div>\n')
         else:
-            html_parts.append('<div style="color: #666; font-style: italic;">No content available for export</div>')
+            w('<div style="color: #666; font-style: italic;">No content available for export</div>\n')
         
-        html_parts.append('</div>')
-        html_parts.append('</div>')
+        w('</div>\n')
+        w('</div>\n')
     else:
         # Procesamiento con páginas estructuradas
         has_content = False
@@ -783,97 +1034,45 @@ def generate_html_with_layout(layout_analysis: Dict, content: Dict) -> str:
             page_width = max(595, page_bbox["x1"] - page_bbox["x0"])
             page_height = max(842, page_bbox["y1"] - page_bbox["y0"])
             
-            html_parts.append(f'<div class="page" style="width: {page_width}px; height: {page_height}px;">')
-            html_parts.append('<div class="page-content">')
+            w(f'<div class="page" style="width: {page_width}px; height: {page_height}px;">\n')
+            w('<div class="page-content">\n')
             
             # Procesar elementos con coordenadas
-            all_elements = []
-            for column in page_data.get("columns", []):
-                all_elements.extend(column.get("elements", []))
-            
             page_has_content = False
-            for elem in all_elements:
-                element_data = elem.get("element", {})
-                text = element_data.get("text", "").strip()
-                
-                if not text:
-                    continue
-                
-                x = max(0, elem.get("x0", 0) - page_bbox["x0"])
-                y = max(0, elem.get("y0", 0) - page_bbox["y0"])
-                font_size = element_data.get("font_size", 11)
-                
-                import html as html_module
-                text_escaped = html_module.escape(text)
-                
-                style = f"left: {x}px; top: {y}px; font-size: {font_size}px; font-family: Arial;"
-                html_parts.append(f'<div class="text-element" style="{style}">{text_escaped}</div>')
+            page_x0 = page_bbox["x0"]
+            page_y0 = page_bbox["y0"]
+            for elem in _page_elements(page_data):
+                x = max(0, elem.x0 - page_x0)
+                y = max(0, elem.y0 - page_y0)
+                w(_TEXT_ELEM_TPL % (x, y, elem.font_size, _fast_escape(elem.text)))
                 page_has_content = True
                 has_content = True
             
             # Si la página estructurada no tiene contenido, usar fallback
             if not page_has_content:
-                html_parts.append('<div class="content-block">')
+                w('<div class="content-block">\n')
                 
                 if isinstance(content, dict):
-                    import html as html_module
-                    
-                    # Procesar título si existe
-                    if "title" in content and content["title"]:
-                        title_escaped = html_module.escape(content["title"])
-                        html_parts.append(f'<h1 style="margin-bottom: 20px; color: #333;">{title_escaped}</h1>')
-                    
-                    # Procesar texto plano
-                    if "text" in content and content["text"]:
-                        text_escaped = html_module.escape(content["text"])
-                        paragraphs = text_escaped.split('\n\n')
-                        for para in paragraphs:
-                            if para.strip():
-                                html_parts.append(f'<div style="margin-bottom: 15px;">{para.replace(chr(10), "<br>")}</div>')
-                    
-                    # Procesar tablas
-                    if "tables" in content and content["tables"]:
-                        for i, table in enumerate(content["tables"]):
-                            html_parts.append(f'<h3>Table {i+1}</h3>')
-                            html_parts.append('<table class="table-element">')
-                            
-                            if isinstance(table, dict) and "data" in table:
-                                table_data = table["data"]
-                                if table_data and len(table_data) > 0:
-                                    # Primera fila como header
-                                    html_parts.append('<tr>')
-                                    for cell in table_data[0]:
-                                        cell_escaped = html_module.escape(str(cell))
-                                        html_parts.append(f'<th>{cell_escaped}</th>')
-                                    html_parts.append('</tr>')
-                                    
-                                    # Resto de filas
-                                    for row in table_data[1:]:
-                                        html_parts.append('<tr>')
-                                        for cell in row:
-                                            cell_escaped = html_module.escape(str(cell))
-                                            html_parts.append(f'<td>{cell_escaped}</td>')
-                                        html_parts.append('</tr>')
-                            html_parts.append('</table>')
+                    _render_content_fallback(content, w, use_elements=False)
                 
-                html_parts.append('</div>')
+                w('</div>\n')
                 has_content = True
             
-            html_parts.append('</div>')
-            html_parts.append('</div>')
+            w('</div>\n')
+            w('</div>\n')
         
         # Si ninguna página tuvo contenido, mostrar mensaje
         if not has_content:
-            html_parts.append('<div class="page" style="width: 595px; min-height: 842px;">')
-            html_parts.append('<div class="content-block">')
-            html_parts.append('<div style="color: #666; font-style: italic;">No content could be extracted from the document structure. Please try uploading the document again.</div>')
-            html_parts.append('</div>')
-            html_parts.append('</div>')
+            w('<div class="page" style="width: 595px; min-height: 842px;">\n')
+            w('<div class="content-block">\n')
+            w('<div style="color: #666; font-style: italic;">No content could be extracted from the document structure. Please try uploading the document again.</div>\n')
+            w('</div>\n')
+            w('</div>\n')
     
-    html_parts.append('</div>')
-    html_parts.append("</body></html>")
+    w('</div>\n')
+    w("</body></html>")
     
-    return '\n'.join(html_parts)
+    return buffer.getvalue()
 
 def generate_text_with_layout(layout_analysis: Dict, content: Dict) -> str:
     """Genera texto preservando el layout original."""
@@ -882,29 +1081,35 @@ def generate_text_with_layout(layout_analysis: Dict, content: Dict) -> str:
     pages = layout_analysis.get("pages", {})
     reading_order = layout_analysis.get("reading_order", [])
     
-    current_page = None
-    
+    # Primera pasada: página, texto, posición X y tipo de cada elemento
+    page_nums = []
+    texts = []
+    x_positions = []
+    types = []
     for order_item in reading_order:
-        page_num = order_item.get("page", 1)
         element = order_item.get("element", {})
-        
+        page_nums.append(order_item.get("page", 1))
+        texts.append(element.get("text", "").strip())
+        x_positions.append(element.get("bbox", {}).get("x0", 0))
+        types.append(element.get("type", ""))
+    
+    # Indentación basada en posición X, aproximadamente 1 espacio por 20px
+    indents = np.maximum(0, np.trunc(np.asarray(x_positions, dtype=np.float64) / 20)).astype(np.int64).tolist()
+    
+    # Segunda pasada: emite el texto
+    current_page = None
+    for page_num, text, indent, element_type in zip(page_nums, texts, indents, types):
         # Añade header de página
         if current_page != page_num:
             current_page = page_num
-            text_parts.append(f"\n{'='*60}")
+            text_parts.append(f"\n{_PAGE_RULE}")
             text_parts.append(f"PAGE {page_num}")
-            text_parts.append(f"{'='*60}\n")
+            text_parts.append(f"{_PAGE_RULE}\n")
         
         # Añade texto del elemento
-        text = element.get("text", "").strip()
         if text:
-            # Calcula indentación basada en posición X
-            bbox = element.get("bbox", {})
-            x_pos = bbox.get("x0", 0)
-            indent = max(0, int(x_pos / 20))  # Aproximadamente 1 espacio por 20px
-            
             # Añade espaciado vertical si es necesario
-            if "header" in element.get("type", ""):
+            if "header" in element_type:
                 text_parts.append(f"\n{' ' * indent}{text.upper()}")
                 text_parts.append(f"{' ' * indent}{'-' * len(text)}")
             else:
@@ -916,21 +1121,51 @@ def generate_excel_with_layout(layout_analysis: Dict, content: Dict, file_path:
     """Genera Excel con posicionamiento preciso preservando el layout original."""
     import pandas as pd
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+    from openpyxl.utils import get_column_letter
     from openpyxl.utils.dataframe import dataframe_to_rows
     
-    # Crear workbook
-    wb = Workbook()
+    # Workbook en modo write_only: las filas se escriben en streaming sin
+    # mantener la matriz de celdas en memoria
+    wb = Workbook(write_only=True)
     
     pages = layout_analysis.get("pages", {})
     
+    # En write_only no hay hoja activa: la página 1 (o la hoja por defecto si
+    # no existe) se crea primero para conservar el orden de las hojas
+    sheets = {}
+    if 1 in pages:
+        sheets[1] = wb.create_sheet(title="Page_1")
+    else:
+        wb.create_sheet(title="Sheet")
+    
+    # Los estilos son inmutables: se crean una vez y se comparten entre celdas
+    font_cache = {}
+    
+    def text_font(size, bold):
+        key = (size, bold)
+        font = font_cache.get(key)
+        if font is None:
+            font = Font(size=size, bold=bold, name="Arial")
+            font_cache[key] = font
+        return font
+    
+    align_top_left = Alignment(horizontal='left', vertical='top', wrap_text=True)
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    header_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+    title_fill = PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid")
+    bold_font = Font(bold=True)
+    info_font = Font(bold=True, color="666666")
+    
     for page_num, page_data in pages.items():
         # Crear hoja para cada página
-        if page_num == 1:
-            ws = wb.active
-            ws.title = f"Page_{page_num}"
-        else:
-            ws = wb.create_sheet(title=f"Page_{page_num}")
+        ws = sheets.get(page_num) or wb.create_sheet(title=f"Page_{page_num}")
         
         # Configurar dimensiones de página
         page_bbox = page_data.get("bounding_box", {"x0": 0, "y0": 0, "x1": 595, "y1": 842})
@@ -946,12 +1181,15 @@ def generate_excel_with_layout(layout_analysis: Dict, content: Dict, file_path:
         
         # Configurar anchos de columna
         for col in range(1, max_col + 1):
-            ws.column_dimensions[ws.cell(row=1, column=col).column_letter].width = 3
+            ws.column_dimensions[get_column_letter(col)].width = 3
         
         # Configurar alturas de fila
         for row in range(1, max_row + 1):
             ws.row_dimensions[row].height = 12
         
+        # Modelo disperso de la hoja: (fila, columna) -> atributos de la celda
+        cells = {}
+        
         # Procesar elementos de texto
         all_elements = []
         for column in page_data.get("columns", []):
@@ -959,6 +1197,10 @@ def generate_excel_with_layout(layout_analysis: Dict, content: Dict, file_path:
         
         all_elements.sort(key=lambda x: (x.get("y0", 0), x.get("x0", 0)))
         
+        # Primera fila libre de cada columna: como los elementos van ordenados
+        # por Y, las filas pedidas en una columna nunca retroceden
+        next_free = [1] * (max_col + 2)
+        
         for elem in all_elements:
             element_data = elem.get("element", {})
             text = element_data.get("text", "").strip()
@@ -978,32 +1220,26 @@ def generate_excel_with_layout(layout_analysis: Dict, content: Dict, file_path:
             row_pos = min(row_pos, max_row)
             
             # Encontrar celda vacía más cercana
-            while row_pos <= max_row and ws.cell(row=row_pos, column=col_pos).value:
-                row_pos += 1
+            row_pos = max(row_pos, next_free[col_pos])
             
             if row_pos <= max_row:
-                cell = ws.cell(row=row_pos, column=col_pos)
-                cell.value = text
+                next_free[col_pos] = row_pos + 1
                 
                 # Aplicar formato
                 font_size = element_data.get("font_size", 11)
                 font_weight = "bold" if element_data.get("flags", 0) & 16 else "normal"
                 is_header = font_size > 12 and len(text) < 100
                 
-                cell.font = Font(
-                    size=max(8, min(18, font_size)),
-                    bold=(font_weight == "bold" or is_header),
-                    name="Arial"
-                )
-                
-                cell.alignment = Alignment(
-                    horizontal='left',
-                    vertical='top',
-                    wrap_text=True
-                )
+                cell = {
+                    "value": text,
+                    "font": text_font(max(8, min(18, font_size)), font_weight == "bold" or is_header),
+                    "alignment": align_top_left
+                }
                 
                 if is_header:
-                    cell.fill = PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid")
+                    cell["fill"] = title_fill
+                
+                cells[(row_pos, col_pos)] = cell
         
         # Procesar tablas
         for table in page_data.get("tables", []):
@@ -1025,32 +1261,46 @@ def generate_excel_with_layout(layout_analysis: Dict, content: Dict, file_path:
                         excel_col = start_col + col_idx
                         
                         if excel_row <= max_row and excel_col <= max_col:
-                            cell = ws.cell(row=excel_row, column=excel_col)
-                            cell.value = str(cell_value)
+                            # Las celdas de tabla se superponen a las de texto
+                            cell = cells.setdefault((excel_row, excel_col), {})
+                            cell["value"] = str(cell_value)
                             
                             # Formato de tabla
-                            thin_border = Border(
-                                left=Side(style='thin'),
-                                right=Side(style='thin'),
-                                top=Side(style='thin'),
-                                bottom=Side(style='thin')
-                            )
-                            cell.border = thin_border
+                            cell["border"] = thin_border
                             
                             # Header de tabla
                             if row_idx == 0:
-                                cell.font = Font(bold=True)
-                                cell.fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+                                cell["font"] = bold_font
+                                cell["fill"] = header_fill
         
         # Añadir información de página en la primera fila
-        info_cell = ws.cell(row=1, column=1)
-        info_cell.value = f"Page {page_num} - Layout preserved export"
-        info_cell.font = Font(bold=True, color="666666")
+        info_cell = cells.setdefault((1, 1), {})
+        info_cell["value"] = f"Page {page_num} - Layout preserved export"
+        info_cell["font"] = info_font
+        
+        # Volcar la hoja fila a fila (las filas vacías también, para conservar su altura)
+        rows = defaultdict(list)
+        for (row, col), attributes in cells.items():
+            rows[row].append((col, attributes))
+        
+        for row in range(1, max_row + 1):
+            row_values = []
+            for col, attributes in sorted(rows.get(row, ())):
+                row_values.extend([None] * (col - 1 - len(row_values)))
+                cell = WriteOnlyCell(ws, value=attributes["value"])
+                for name in ("font", "alignment", "fill", "border"):
+                    if name in attributes:
+                        setattr(cell, name, attributes[name])
+                row_values.append(cell)
+            ws.append(row_values)
     
     # Guardar archivo
     wb.save(file_path)
     return file_path
 
+# Caracteres que add_run convierte en <w:tab/> o <w:br/>
+_DOCX_RUN_BREAKS = re.compile(r'([\t\r\n])')
+
 def generate_docx_with_layout(layout_analysis: Dict, content: Dict, file_path: str) -> str:
     """Genera DOCX con posicionamiento absoluto preservando el layout original."""
     try:
@@ -1058,11 +1308,52 @@ def generate_docx_with_layout(layout_analysis: Dict, content: Dict, file_path: s
         from docx.shared import Inches, Pt
         from docx.enum.text import WD_ALIGN_PARAGRAPH
         from docx.enum.section import WD_SECTION
+        from docx.oxml.ns import qn
+        from lxml import etree
     except ImportError:
         raise ImportError("python-docx is required for DOCX export. Install with: pip install python-docx")
     
     doc = Document()
     
+    # Los runs de texto se construyen directamente como XML (<w:r>): mismo
+    # resultado que Paragraph.add_run + run.font.*, sin los proxies de python-docx
+    W_R, W_RPR, W_T, W_TAB, W_BR = qn("w:r"), qn("w:rPr"), qn("w:t"), qn("w:tab"), qn("w:br")
+    W_B, W_I, W_SZ, W_VAL = qn("w:b"), qn("w:i"), qn("w:sz"), qn("w:val")
+    XML_SPACE = qn("xml:space")
+    run_properties_cache = {}
+    
+    def run_properties(font_size, bold, italic):
+        """<w:rPr> para (tamaño, negrita, cursiva); se construye una vez y se clona."""
+        key = (font_size, bold, italic)
+        rpr = run_properties_cache.get(key)
+        if rpr is None:
+            rpr = etree.Element(W_RPR)
+            for tag, enabled in ((W_B, bold), (W_I, italic)):
+                flag = etree.SubElement(rpr, tag)
+                if not enabled:
+                    flag.set(W_VAL, "0")
+            etree.SubElement(rpr, W_SZ).set(W_VAL, str(int(Pt(font_size).pt * 2)))
+            run_properties_cache[key] = rpr
+        return copy.deepcopy(rpr)
+    
+    def add_run(para, text, properties=None):
+        """Añade un run al párrafo; tabs y saltos de línea se convierten como en add_run."""
+        run = etree.SubElement(para._p, W_R)
+        if properties is not None:
+            run.append(run_properties(*properties))
+        for part in _DOCX_RUN_BREAKS.split(text):
+            if not part:
+                continue
+            if part == "\t":
+                etree.SubElement(run, W_TAB)
+            elif part == "\n" or part == "\r":
+                etree.SubElement(run, W_BR)
+            else:
+                text_element = etree.SubElement(run, W_T)
+                text_element.text = part
+                if len(part.strip()) < len(part):
+                    text_element.set(XML_SPACE, "preserve")
+    
     pages = layout_analysis.get("pages", {})
     
     for page_num, page_data in pages.items():
@@ -1089,80 +1380,53 @@ def generate_docx_with_layout(layout_analysis: Dict, content: Dict, file_path: s
         page_bbox = page_data.get("bounding_box", {"x0": 0, "y0": 0, "x1": 595, "y1": 842})
         
         # Procesar elementos de texto agrupados por posición Y aproximada
-        all_elements = []
-        for column in page_data.get("columns", []):
-            all_elements.extend(column.get("elements", []))
+        elements = _page_elements(page_data)
         
-        # Agrupar elementos por líneas aproximadas
-        lines = {}
-        for elem in all_elements:
-            element_data = elem.get("element", {})
-            text = element_data.get("text", "").strip()
-            
-            if not text:
-                continue
-                
-            y_pos = int(elem.get("y0", 0) / 20) * 20  # Agrupar por líneas de 20px
-            x_pos = elem.get("x0", 0)
-            
-            if y_pos not in lines:
-                lines[y_pos] = []
-            
-            lines[y_pos].append({
-                "text": text,
-                "x": x_pos,
-                "font_size": element_data.get("font_size", 11),
-                "flags": element_data.get("flags", 0)
-            })
+        # Negrita (bit 16) y cursiva (bit 64) de todos los elementos a la vez
+        flags_array = np.fromiter((elem.flags for elem in elements), dtype=np.int64, count=len(elements))
+        bold = (flags_array & 16).astype(bool).tolist()
+        italic = (flags_array & 64).astype(bool).tolist()
+        
+        # Agrupar elementos por líneas aproximadas de 20px (trunc igual que int())
+        # y ordenar por línea y posición X en el núcleo compilado
+        x_array = np.fromiter((elem.x0 for elem in elements), dtype=np.float64, count=len(elements))
+        y_array = np.fromiter((elem.y0 for elem in elements), dtype=np.float64, count=len(elements))
+        order, line_starts = _line_order(x_array, y_array)
+        lines = np.split(order, line_starts) if order.size else []
         
         # Procesar líneas ordenadas
-        for y_pos in sorted(lines.keys()):
-            line_elements = sorted(lines[y_pos], key=lambda x: x["x"])
+        for line in lines:
+            line_indices = line.tolist()
             
             # Crear párrafo para la línea
             para = doc.add_paragraph()
             
             # Determinar si usar columnas (elementos muy separados en X)
-            if len(line_elements) > 1:
-                x_gaps = []
-                for i in range(1, len(line_elements)):
-                    gap = line_elements[i]["x"] - line_elements[i-1]["x"]
-                    x_gaps.append(gap)
-                
-                # Si hay gaps grandes, usar tabulaciones
-                avg_gap = sum(x_gaps) / len(x_gaps) if x_gaps else 0
-                large_gaps = [gap for gap in x_gaps if gap > avg_gap * 2]
+            if len(line_indices) > 1:
+                x_gaps = np.diff(x_array[line])
                 
-                if large_gaps:
-                    # Elementos en columnas - usar espaciado
-                    for i, elem in enumerate(line_elements):
-                        if i > 0:
-                            para.add_run("\t" * max(1, int(large_gaps[0] / 100)))
-                        
-                        run = para.add_run(elem["text"])
-                        run.font.size = Pt(max(8, min(18, elem["font_size"])))
-                        run.font.bold = bool(elem["flags"] & 16)
-                        run.font.italic = bool(elem["flags"] & 64)
+                # Si hay gaps grandes, usar tabulaciones; si no, concatenar con espacios
+                avg_gap = x_gaps.mean()
+                large_gaps = np.flatnonzero(x_gaps > avg_gap * 2)
+                if large_gaps.size:
+                    separator = "\t" * max(1, int(x_gaps[large_gaps[0]] / 100))
                 else:
-                    # Elementos en la misma línea - concatenar con espacios
-                    for i, elem in enumerate(line_elements):
-                        if i > 0:
-                            para.add_run(" ")
-                        
-                        run = para.add_run(elem["text"])
-                        run.font.size = Pt(max(8, min(18, elem["font_size"])))
-                        run.font.bold = bool(elem["flags"] & 16)
-                        run.font.italic = bool(elem["flags"] & 64)
+                    separator = " "
+                
+                for i, index in enumerate(line_indices):
+                    if i > 0:
+                        add_run(para, separator)
+                    
+                    elem = elements[index]
+                    add_run(para, elem.text, (max(8, min(18, elem.font_size)), bold[index], italic[index]))
             else:
                 # Un solo elemento
-                elem = line_elements[0]
-                run = para.add_run(elem["text"])
-                run.font.size = Pt(max(8, min(18, elem["font_size"])))
-                run.font.bold = bool(elem["flags"] & 16)
-                run.font.italic = bool(elem["flags"] & 64)
+                index = line_indices[0]
+                elem = elements[index]
+                add_run(para, elem.text, (max(8, min(18, elem.font_size)), bold[index], italic[index]))
                 
                 # Si es un header grande, centrarlo
-                if elem["font_size"] > 14 and len(elem["text"]) < 100:
+                if elem.font_size > 14 and len(elem.text) < 100:
                     para.alignment = WD_ALIGN_PARAGRAPH.CENTER
         
         # Procesar tablas
@@ -1,12 +1,82 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
+import queue
 import os
 import sys
 import subprocess
 import platform
-from pdf_to_tables import extract_tables_from_pdf, extract_tables_with_format, process_multiple_pdfs
+import functools
+import hashlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Separador del resumen final en el log
+_SEP = "=" * 50
+
+# Índice persistente de PDFs ya procesados: clave del PDF -> archivo de salida y
+# firma (fecha de modificación y tamaño) de los archivos que generó
+_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".pdf_extractor", "index.json")
+
+
+def _load_index():
+    """Carga el índice de PDFs procesados; si no existe o está dañado empieza vacío."""
+    try:
+        with open(_INDEX_PATH, encoding="utf-8") as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    """Guarda el índice de forma atómica (archivo temporal + reemplazo)."""
+    os.makedirs(os.path.dirname(_INDEX_PATH), exist_ok=True)
+    tmp_path = _INDEX_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, _INDEX_PATH)
+
+
+def _file_key(pdf_file, stat, format_type):
+    """Clave del PDF a partir de ruta, fecha de modificación y tamaño (sin leer el archivo)."""
+    raw = f"{os.path.abspath(pdf_file)}|{stat.st_mtime_ns}|{stat.st_size}|{format_type}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _output_signature(output_file, format_type):
+    """Firma [mtime_ns, tamaño] de cada archivo que genera extract_tables_with_format.
+    
+    Devuelve None si falta alguno. Si otro PDF sobrescribe la salida la firma cambia,
+    así la entrada del índice deja de valer aunque la ruta coincida.
+    """
+    extensions = {"excel": (".xlsx",), "csv": (".csv",)}.get(format_type, (".xlsx", ".csv"))
+    signature = []
+    for extension in extensions:
+        try:
+            stat = os.stat(output_file + extension)
+        except OSError:
+            return None
+        signature.append([stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+def _open_detached(command):
+    """Lanza un programa externo sin heredar la consola ni los descriptores de la GUI."""
+    subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, close_fds=True, start_new_session=True)
+
+
+def _extract_one(pdf_file, output_file, format_type):
+    """Procesa un PDF en un proceso del pool; debe ser de módulo para poder serializarse."""
+    # Import diferido: la GUI arranca sin cargar pandas/docling y cada proceso del
+    # pool lo importa una sola vez, en su primer archivo
+    from pdf_to_tables import extract_tables_with_format
+    return extract_tables_with_format(pdf_file, output_file + ".xlsx", format_type)
 
 
 class SimplePDFExtractor:
@@ -18,33 +88,69 @@ class SimplePDFExtractor:
         
         # Variables
         self.pdf_files = []
+        self._pdf_seen = set()
         self.output_dir = tk.StringVar(value=os.getcwd())
         self.output_format = tk.StringVar(value="excel")
         
+        # Mensajes de log pendientes; solo el hilo de la UI los escribe en el widget
+        self._log_queue = queue.Queue()
+        self.max_log_lines = 2000
+        
+        # Progreso del lote (completados, total): el hilo de trabajo lo actualiza y
+        # la UI lo consulta cada 200 ms, sin encolar un evento por archivo
+        self._progress = (0, 0)
+        self._shown_progress = None
+        self._progress_job = None
+        
+        # Pool de procesos reutilizado entre ejecuciones (se crea al procesar por primera vez)
+        self._executor = None
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        self.setup_styles()
         self.create_interface()
         self.add_log("🎉 Extractor de Tablas PDF - Listo para usar")
+        self.root.after(100, self._drain_log)
+    
+    def setup_styles(self):
+        """Estilos ttk compartidos por los marcos y etiquetas estáticos de la interfaz"""
+        style = ttk.Style()
+        style.theme_use('clam')
+        
+        style.configure('Navy.TFrame', background='navy')
+        style.configure('White.TFrame', background='white')
+        style.configure('Gray.TFrame', background='lightgray')
+        style.configure('Sunken.TFrame', background='lightgray', relief='sunken', borderwidth=2)
+        style.configure('Console.TFrame', background='black', relief='sunken', borderwidth=2)
+        style.configure('Section.TLabelframe', background='white', relief='groove', borderwidth=3)
+        style.configure('Section.TLabelframe.Label', font=('Arial', 12, 'bold'),
+                        foreground='navy', background='white')
+        style.configure('Header.TLabel', font=('Arial', 18, 'bold'),
+                        foreground='white', background='navy')
+        style.configure('Field.TLabel', font=('Arial', 11, 'bold'),
+                        foreground='black', background='white')
+        style.configure('LogHeader.TLabel', font=('Arial', 10, 'bold'),
+                        foreground='black', background='lightgray')
     
     def create_interface(self):
         # === TÍTULO ===
-        title_frame = tk.Frame(self.root, bg='navy', height=70)
+        title_frame = ttk.Frame(self.root, style='Navy.TFrame', height=70)
         title_frame.pack(fill=tk.X)
         title_frame.pack_propagate(False)
         
-        tk.Label(title_frame, text="📊 EXTRACTOR DE TABLAS PDF", 
-                font=('Arial', 18, 'bold'), fg='white', bg='navy').pack(expand=True)
+        ttk.Label(title_frame, text="📊 EXTRACTOR DE TABLAS PDF",
+                  style='Header.TLabel').pack(expand=True)
         
         # === CONTENIDO PRINCIPAL ===
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = ttk.Frame(self.root, style='White.TFrame')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
         # === SECCIÓN 1: ARCHIVOS ===
-        files_section = tk.LabelFrame(main_frame, text=" 📁 ARCHIVOS PDF ",
-                                     font=('Arial', 12, 'bold'), fg='navy',
-                                     bg='white', relief=tk.GROOVE, bd=3)
+        files_section = ttk.LabelFrame(main_frame, text=" 📁 ARCHIVOS PDF ",
+                                      style='Section.TLabelframe')
         files_section.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
         
         # Lista de archivos
-        list_frame = tk.Frame(files_section, bg='lightgray', relief=tk.SUNKEN, bd=2)
+        list_frame = ttk.Frame(files_section, style='Sunken.TFrame')
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         self.files_listbox = tk.Listbox(list_frame, font=('Arial', 11), height=6,
@@ -60,7 +166,7 @@ class SimplePDFExtractor:
         self.files_listbox.config(fg='gray')
         
         # Botones de archivos
-        btn_frame = tk.Frame(files_section, bg='white')
+        btn_frame = ttk.Frame(files_section, style='White.TFrame')
         btn_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
         
         tk.Button(btn_frame, text="📂 Seleccionar PDFs", command=self.select_files,
@@ -77,19 +183,18 @@ class SimplePDFExtractor:
         self.count_label.pack(side=tk.RIGHT, padx=10)
         
         # === SECCIÓN 2: CONFIGURACIÓN ===
-        config_section = tk.LabelFrame(main_frame, text=" ⚙️ CONFIGURACIÓN ",
-                                      font=('Arial', 12, 'bold'), fg='navy',
-                                      bg='white', relief=tk.GROOVE, bd=3)
+        config_section = ttk.LabelFrame(main_frame, text=" ⚙️ CONFIGURACIÓN ",
+                                       style='Section.TLabelframe')
         config_section.pack(fill=tk.X, pady=(0, 15))
         
         # Carpeta de salida
-        output_frame = tk.Frame(config_section, bg='white')
+        output_frame = ttk.Frame(config_section, style='White.TFrame')
         output_frame.pack(fill=tk.X, padx=10, pady=10)
         
-        tk.Label(output_frame, text="📁 Carpeta de salida:",
-                font=('Arial', 11, 'bold'), fg='black', bg='white').pack(anchor='w')
+        ttk.Label(output_frame, text="📁 Carpeta de salida:",
+                  style='Field.TLabel').pack(anchor='w')
         
-        path_container = tk.Frame(output_frame, bg='lightgray', relief=tk.SUNKEN, bd=2)
+        path_container = ttk.Frame(output_frame, style='Sunken.TFrame')
         path_container.pack(fill=tk.X, pady=(5, 10))
         
         self.output_entry = tk.Entry(path_container, textvariable=self.output_dir,
@@ -106,13 +211,13 @@ class SimplePDFExtractor:
                  relief=tk.RAISED, bd=1, padx=8, pady=3).pack(side=tk.RIGHT, padx=2, pady=2)
         
         # Formato de salida
-        format_frame = tk.Frame(config_section, bg='white')
+        format_frame = ttk.Frame(config_section, style='White.TFrame')
         format_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
         
-        tk.Label(format_frame, text="📊 Formato de salida:",
-                font=('Arial', 11, 'bold'), fg='black', bg='white').pack(anchor='w')
+        ttk.Label(format_frame, text="📊 Formato de salida:",
+                  style='Field.TLabel').pack(anchor='w')
         
-        radio_container = tk.Frame(format_frame, bg='lightgray', relief=tk.SUNKEN, bd=2)
+        radio_container = ttk.Frame(format_frame, style='Sunken.TFrame')
         radio_container.pack(fill=tk.X, pady=(5, 0))
         
         tk.Radiobutton(radio_container, text=" 📊 Solo Excel (.xlsx) ",
@@ -128,13 +233,12 @@ class SimplePDFExtractor:
                       font=('Arial', 10), bg='white', fg='black').pack(side=tk.LEFT, padx=10, pady=5)
         
         # === SECCIÓN 3: PROCESAMIENTO ===
-        process_section = tk.LabelFrame(main_frame, text=" 🚀 PROCESAMIENTO ",
-                                       font=('Arial', 12, 'bold'), fg='navy',
-                                       bg='white', relief=tk.GROOVE, bd=3)
+        process_section = ttk.LabelFrame(main_frame, text=" 🚀 PROCESAMIENTO ",
+                                        style='Section.TLabelframe')
         process_section.pack(fill=tk.X, pady=(0, 15))
         
         # Botón principal
-        button_container = tk.Frame(process_section, bg='white')
+        button_container = ttk.Frame(process_section, style='White.TFrame')
         button_container.pack(pady=15)
         
         self.process_button = tk.Button(button_container, text="🚀 EXTRAER TABLAS DE TODOS LOS PDFs",
@@ -151,25 +255,24 @@ class SimplePDFExtractor:
         self.status_label.pack(pady=(0, 10))
         
         # === SECCIÓN 4: LOG ===
-        log_section = tk.LabelFrame(main_frame, text=" 📋 REGISTRO DE ACTIVIDAD ",
-                                   font=('Arial', 12, 'bold'), fg='navy',
-                                   bg='white', relief=tk.GROOVE, bd=3)
+        log_section = ttk.LabelFrame(main_frame, text=" 📋 REGISTRO DE ACTIVIDAD ",
+                                    style='Section.TLabelframe')
         log_section.pack(fill=tk.BOTH, expand=True)
         
         # Header del log
-        log_header = tk.Frame(log_section, bg='lightgray', height=35)
+        log_header = ttk.Frame(log_section, style='Gray.TFrame', height=35)
         log_header.pack(fill=tk.X, padx=2, pady=2)
         log_header.pack_propagate(False)
         
-        tk.Label(log_header, text="Mensajes del sistema:",
-                font=('Arial', 10, 'bold'), fg='black', bg='lightgray').pack(side=tk.LEFT, padx=10, pady=8)
+        ttk.Label(log_header, text="Mensajes del sistema:",
+                  style='LogHeader.TLabel').pack(side=tk.LEFT, padx=10, pady=8)
         
         tk.Button(log_header, text="🗑️ Limpiar Log", command=self.clear_log,
                  bg='gray', fg='white', font=('Arial', 8, 'bold'),
                  relief=tk.RAISED, bd=1, padx=10, pady=5).pack(side=tk.RIGHT, padx=10, pady=3)
         
         # Área de texto del log
-        log_container = tk.Frame(log_section, bg='black', relief=tk.SUNKEN, bd=2)
+        log_container = ttk.Frame(log_section, style='Console.TFrame')
         log_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
         
         self.log_text = scrolledtext.ScrolledText(log_container, font=('Courier', 10),
@@ -179,11 +282,41 @@ class SimplePDFExtractor:
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
     
     def add_log(self, message):
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
-        self.root.update_idletasks()
+        # Se puede llamar desde cualquier hilo: solo encola el mensaje
+        self._log_queue.put(message)
+    
+    def _drain_log(self):
+        """Escribe en el log todos los mensajes pendientes con un único insert."""
+        messages = []
+        try:
+            while True:
+                messages.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if messages:
+            self.log_text.config(state=tk.NORMAL)
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            
+            # Conservar solo las últimas líneas para acotar el coste del widget
+            lines = int(self.log_text.index('end-1c').split('.')[0])
+            if lines > self.max_log_lines:
+                self.log_text.delete("1.0", f"{lines - self.max_log_lines + 1}.0")
+            
+            self.log_text.see(tk.END)
+            self.log_text.config(state=tk.DISABLED)
+        
+        self.root.after(100, self._drain_log)
+    
+    def _poll_progress(self):
+        """Muestra el progreso del lote en la etiqueta de estado mientras se procesa."""
+        progress = self._progress
+        done, total = progress
+        if done and progress != self._shown_progress:
+            self._shown_progress = progress
+            self.status_label.config(text=f"🔄 Procesando archivo {done} de {total}...")
+        
+        self._progress_job = self.root.after(200, self._poll_progress)
     
     def clear_log(self):
         self.log_text.config(state=tk.NORMAL)
@@ -203,17 +336,21 @@ class SimplePDFExtractor:
                 self.files_listbox.delete(0, tk.END)
                 self.files_listbox.config(fg='black')
             
-            for file in files:
-                if file not in self.pdf_files:
-                    self.pdf_files.append(file)
-                    filename = os.path.basename(file)
-                    self.files_listbox.insert(tk.END, f"📄 {filename}")
+            # Todos los archivos nuevos se añaden a la lista con un único insert; si
+            # todos estaban ya seleccionados no se llama a Tk
+            new_files = [file for file in dict.fromkeys(files) if file not in self._pdf_seen]
+            labels = [f"📄 {os.path.basename(file)}" for file in new_files]
+            self.pdf_files.extend(new_files)
+            self._pdf_seen.update(new_files)
+            if labels:
+                self.files_listbox.insert(tk.END, *labels)
             
             self.update_count()
             self.add_log(f"✅ Agregados {len(files)} archivo(s) PDF")
     
     def clear_files(self):
         self.pdf_files.clear()
+        self._pdf_seen.clear()
         self.files_listbox.delete(0, tk.END)
         self.files_listbox.insert(0, "🎯 Selecciona archivos PDF usando los botones de abajo")
         self.files_listbox.config(fg='gray')
@@ -247,9 +384,9 @@ class SimplePDFExtractor:
             if platform.system() == "Windows":
                 os.startfile(folder_path)
             elif platform.system() == "Darwin":  # macOS
-                subprocess.Popen(["open", folder_path])
+                _open_detached(["open", folder_path])
             else:  # Linux
-                subprocess.Popen(["xdg-open", folder_path])
+                _open_detached(["xdg-open", folder_path])
             
             self.add_log(f"🗂️ Abriendo carpeta: {folder_path}")
             
@@ -266,66 +403,162 @@ class SimplePDFExtractor:
         self.process_button.config(state=tk.DISABLED, text="🔄 PROCESANDO...", bg='red')
         self.status_label.config(text="🔄 Procesando archivos PDF...", fg='orange')
         
+        self._progress = (0, 0)
+        self._shown_progress = None
+        self._progress_job = self.root.after(200, self._poll_progress)
+        
         # Ejecutar en hilo separado
-        thread = threading.Thread(target=self._process_thread)
+        # La configuración se lee aquí, en el hilo de la UI, y se pasa al hilo de trabajo
+        thread = threading.Thread(target=self._process_thread,
+                                  args=(self.output_dir.get(), self.output_format.get()))
         thread.daemon = True
         thread.start()
     
-    def _process_thread(self):
+    def _get_executor(self):
+        """Devuelve el pool de procesos, creándolo la primera vez.
+        
+        Los procesos se arrancan con 'spawn' (hacer fork de un proceso con Tk e hilos
+        no es seguro) y se crean según se necesitan, hasta uno por núcleo; después se
+        reutilizan, así los imports de la extracción solo se pagan una vez por proceso.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+    
+    def _discard_executor(self, executor):
+        """Cierra un pool roto (murió un proceso) para que se recree en la próxima ejecución."""
+        executor.shutdown(wait=False)
+        if self._executor is executor:
+            self._executor = None
+    
+    def _on_close(self):
+        """Cerrar la ventana sin esperar a los PDFs pendientes del pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
+    def _process_thread(self, output_dir, format_type):
         try:
             results = []
-            total_files = len(self.pdf_files)
+            index = _load_index()
             
-            for i, pdf_file in enumerate(self.pdf_files):
-                # Actualizar estado
-                self.root.after(0, lambda i=i: self.status_label.config(
-                    text=f"🔄 Procesando archivo {i+1} de {total_files}..."))
+            # Nombre y ruta de salida de cada PDF, calculados una sola vez; los PDFs
+            # sin cambios cuya salida ya existe se saltan
+            jobs = []
+            used_names = set()
+            for pdf_file in self.pdf_files:
+                filename = os.path.basename(pdf_file)
+                pdf_name = os.path.splitext(filename)[0]
+                
+                # PDFs con el mismo nombre en carpetas distintas se procesan a la vez:
+                # cada uno recibe un sufijo para no escribir sobre los mismos archivos
+                output_name = f"{pdf_name}_tablas"
+                counter = 1
+                while output_name.casefold() in used_names:
+                    counter += 1
+                    output_name = f"{pdf_name}_{counter}_tablas"
+                used_names.add(output_name.casefold())
+                output_file = os.path.join(output_dir, output_name)
+                
+                try:
+                    stat = os.stat(pdf_file)
+                except OSError:
+                    key, size = None, 0
+                else:
+                    key, size = _file_key(pdf_file, stat, format_type), stat.st_size
+                entry = index.get(key) if key is not None else None
+                if (isinstance(entry, dict) and entry.get("output") == output_file
+                        and entry.get("signature") == _output_signature(output_file, format_type)):
+                    self.add_log(f"⏭️ En caché: {filename}")
+                    results.append((pdf_file, output_file, True))
+                    continue
+                
+                jobs.append((size, pdf_file, filename, output_file, key))
+            
+            # Los PDFs más grandes primero: los largos no quedan para el final y el
+            # tiempo total se acerca más al del archivo más lento
+            jobs.sort(key=lambda job: job[0], reverse=True)
+            total_files = len(jobs)
+            
+            # Cada PDF se procesa en un proceso del pool compartido; los resultados
+            # llegan según terminan
+            executor = self._get_executor()
+            futures = {
+                executor.submit(_extract_one, pdf_file, output_file,
+                                format_type): (pdf_file, filename, output_file, key)
+                for _, pdf_file, filename, output_file, key in jobs
+            }
+            
+            for i, future in enumerate(as_completed(futures)):
+                pdf_file, filename, output_file, key = futures[future]
                 
-                self.add_log(f"📄 Archivo {i+1}/{total_files}: {os.path.basename(pdf_file)}")
+                # Actualizar estado
+                self._progress = (i + 1, total_files)
                 
-                # Generar nombre de salida
-                pdf_name = os.path.splitext(os.path.basename(pdf_file))[0]
-                output_file = os.path.join(self.output_dir.get(), f"{pdf_name}_tablas")
+                self.add_log(f"📄 Archivo {i+1}/{total_files}: {filename}")
                 
-                # Procesar archivo
-                format_type = self.output_format.get()
-                success = extract_tables_with_format(pdf_file, output_file + ".xlsx", format_type)
+                try:
+                    success = future.result()
+                except Exception as e:
+                    self.add_log(f"💥 Error en el proceso: {str(e)}")
+                    success = False
+                    if isinstance(e, BrokenProcessPool):
+                        # Un proceso murió: el pool ya no sirve y se recrea en la próxima ejecución
+                        self._discard_executor(executor)
                 results.append((pdf_file, output_file, success))
                 
                 if success:
-                    self.add_log(f"✅ EXITOSO: {pdf_name}_tablas")
+                    self.add_log(f"✅ EXITOSO: {os.path.basename(output_file)}")
+                    if key is not None:
+                        signature = _output_signature(output_file, format_type)
+                        if signature is not None:
+                            index[key] = {"output": output_file, "signature": signature}
                 else:
-                    self.add_log(f"❌ ERROR: {os.path.basename(pdf_file)}")
+                    self.add_log(f"❌ ERROR: {filename}")
+            
+            if jobs:
+                try:
+                    _save_index(index)
+                except OSError as e:
+                    self.add_log(f"⚠️ No se pudo guardar el índice: {str(e)}")
             
             # Resumen final
             successful = sum(1 for _, _, success in results if success)
-            self.add_log(f"\n{'='*50}")
-            self.add_log(f"🎯 RESUMEN FINAL: {successful}/{len(results)} archivos procesados")
-            self.add_log(f"{'='*50}")
+            self.add_log(f"\n{_SEP}\n🎯 RESUMEN FINAL: {successful}/{len(results)} archivos procesados\n{_SEP}")
             
+            # Los mensajes se formatean aquí; la UI solo recibe la llamada ya preparada
             if successful == len(results):
-                self.root.after(0, lambda: messagebox.showinfo("🎉 ¡COMPLETADO!", 
-                    f"¡Éxito total! Se procesaron los {successful} archivos PDF.\n\n"
-                    f"📁 Archivos guardados en:\n{self.output_dir.get()}"))
+                message = (f"¡Éxito total! Se procesaron los {successful} archivos PDF.\n\n"
+                           f"📁 Archivos guardados en:\n{output_dir}")
+                self.root.after(0, functools.partial(messagebox.showinfo, "🎉 ¡COMPLETADO!", message))
             elif successful > 0:
-                self.root.after(0, lambda: messagebox.showwarning("⚠️ Parcialmente completado", 
-                    f"Se procesaron {successful} de {len(results)} archivos.\n\n"
-                    f"Revisa el registro para ver detalles de errores."))
+                message = (f"Se procesaron {successful} de {len(results)} archivos.\n\n"
+                           "Revisa el registro para ver detalles de errores.")
+                self.root.after(0, functools.partial(messagebox.showwarning,
+                                                     "⚠️ Parcialmente completado", message))
             else:
-                self.root.after(0, lambda: messagebox.showerror("❌ Error total", 
-                    "No se pudo procesar ningún archivo.\n\n"
-                    "Revisa el registro para ver los errores."))
+                message = ("No se pudo procesar ningún archivo.\n\n"
+                           "Revisa el registro para ver los errores.")
+                self.root.after(0, functools.partial(messagebox.showerror, "❌ Error total", message))
                     
         except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self._executor is not None:
+                self._discard_executor(self._executor)
             self.add_log(f"💥 ERROR CRÍTICO: {str(e)}")
-            self.root.after(0, lambda: messagebox.showerror("Error Crítico", 
-                f"Ocurrió un error inesperado:\n{str(e)}"))
+            # La variable 'e' deja de existir al salir del except: el texto se fija ya
+            message = f"Ocurrió un error inesperado:\n{str(e)}"
+            self.root.after(0, functools.partial(messagebox.showerror, "Error Crítico", message))
         
         finally:
             # Rehabilitar botón
             self.root.after(0, self._finish_processing)
     
     def _finish_processing(self):
+        # Detiene la consulta del progreso para que no sobrescriba el mensaje final
+        if self._progress_job is not None:
+            self.root.after_cancel(self._progress_job)
+            self._progress_job = None
         self.process_button.config(state=tk.NORMAL, text="🚀 EXTRAER TABLAS DE TODOS LOS PDFs", bg='orange')
         self.status_label.config(text="✅ Proceso completado - Listo para procesar más archivos", fg='green')
 
@@ -0,0 +1,641 @@
+"""Ventana de pdf_gui_modern. Solo la importa _launch_gui(), así Tk no se carga en
+el modo línea de comandos ni en los procesos del pool."""
+import threading
+import queue
+import os
+import subprocess
+import platform
+import multiprocessing
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox, scrolledtext
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from pdf_gui_modern import PdfJob, _is_pdf, _preimport, _worker
+
+
+class ModernPDFExtractor:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("PDF Table Extractor")
+        self.root.geometry("900x750")
+        self.root.configure(bg='#f8fafc')
+        self.root.resizable(True, True)
+        
+        # Variables
+        # PDFs en cola: iid de la fila del Treeview (la ruta) -> PdfJob, en orden de llegada
+        self._pdf_jobs = {}
+        self.output_dir = tk.StringVar(value=os.getcwd())
+        self.output_format = tk.StringVar(value="excel")
+        
+        # Colores modernos
+        self.colors = {
+            'bg': '#f8fafc',
+            'primary': '#2563eb',
+            'primary_dark': '#1d4ed8',
+            'secondary': '#64748b',
+            'success': '#059669',
+            'warning': '#d97706',
+            'danger': '#dc2626',
+            'white': '#ffffff',
+            'gray_100': '#f1f5f9',
+            'gray_200': '#e2e8f0',
+            'gray_300': '#cbd5e1',
+            'gray_600': '#475569',
+            'gray_800': '#1e293b'
+        }
+        
+        # Mensajes de log pendientes; solo el hilo de la UI los escribe en el widget
+        self._log_queue = queue.Queue()
+        
+        # Pool de procesos compartido por todas las ejecuciones
+        self._pool = self._create_pool()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        self.setup_styles()
+        self.create_modern_ui()
+        
+        # Mensaje de bienvenida
+        self.add_log("[INFO] Bienvenido al Extractor de Tablas PDF")
+        self.add_log("[INFO] Arrastra archivos PDF aquí o usa el botón de selección")
+        self.root.after(50, self._drain_log_queue)
+    
+    def _create_pool(self):
+        """Crear el pool de procesos de extracción.
+        
+        Con 'spawn' los procesos se arrancan a medida que llegan tareas (hasta uno por
+        núcleo) y cada uno importa pdf_to_tables una sola vez; después se reutilizan.
+        """
+        return ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_preimport)
+    
+    @property
+    def pdf_files(self):
+        """Rutas de los PDFs en cola, derivadas de _pdf_jobs"""
+        return [job.path for job in self._pdf_jobs.values()]
+    
+    def _replace_pool(self, pool):
+        """Sustituir un pool roto (murió un proceso) por uno nuevo"""
+        pool.shutdown(wait=False)
+        if self._pool is pool:
+            self._pool = self._create_pool()
+    
+    def _on_close(self):
+        """Cerrar la ventana sin esperar a los procesos en curso"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
+    def setup_styles(self):
+        """Configurar estilos ttk modernos"""
+        style = ttk.Style()
+        style.theme_use('clam')
+        
+        # Configurar estilos personalizados
+        style.configure('Title.TLabel', font=('Segoe UI', 24, 'bold'), 
+                       foreground=self.colors['primary'], background=self.colors['bg'])
+        style.configure('Heading.TLabel', font=('Segoe UI', 14, 'bold'), 
+                       foreground=self.colors['gray_800'], background=self.colors['white'])
+        style.configure('Modern.TButton', font=('Segoe UI', 10, 'bold'))
+        style.configure('Files.Treeview', font=('Segoe UI', 10), rowheight=26,
+                       background=self.colors['white'], fieldbackground=self.colors['gray_100'],
+                       foreground=self.colors['gray_800'])
+        style.configure('Card.TFrame', background=self.colors['white'], relief='solid',
+                       borderwidth=1, bordercolor=self.colors['gray_300'])
+    
+    def create_modern_ui(self):
+        # ===== CONTENEDOR PRINCIPAL =====
+        main_container = tk.Frame(self.root, bg=self.colors['bg'])
+        main_container.pack(fill=tk.BOTH, expand=True, padx=30, pady=30)
+        
+        # ===== HEADER =====
+        header_frame = tk.Frame(main_container, bg=self.colors['bg'], height=100)
+        header_frame.pack(fill=tk.X, pady=(0, 30))
+        header_frame.pack_propagate(False)
+        
+        # Título principal
+        title_label = tk.Label(header_frame, 
+                              text="📊 PDF Table Extractor",
+                              font=('Segoe UI', 28, 'bold'),
+                              fg=self.colors['primary'], 
+                              bg=self.colors['bg'])
+        title_label.pack(anchor='w')
+        
+        subtitle_label = tk.Label(header_frame,
+                                 text="Extrae tablas de archivos PDF y convierte a Excel/CSV",
+                                 font=('Segoe UI', 12),
+                                 fg=self.colors['secondary'],
+                                 bg=self.colors['bg'])
+        subtitle_label.pack(anchor='w', pady=(5, 0))
+        
+        # ===== GRID DE TARJETAS =====
+        cards_frame = tk.Frame(main_container, bg=self.colors['bg'])
+        cards_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Configurar grid
+        cards_frame.columnconfigure(0, weight=2)
+        cards_frame.columnconfigure(1, weight=1)
+        cards_frame.rowconfigure(0, weight=1)
+        cards_frame.rowconfigure(1, weight=1)
+        
+        # ===== TARJETA 1: ARCHIVOS =====
+        files_card = self.create_card(cards_frame, "📁 Archivos PDF")
+        files_card.grid(row=0, column=0, sticky='nsew', padx=(0, 15), pady=(0, 15))
+        
+        # Área de drop zone
+        drop_zone = tk.Frame(files_card, bg=self.colors['gray_100'], 
+                            relief=tk.SOLID, bd=2, cursor='hand2')
+        drop_zone.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        # Configurar drop zone
+        self.setup_drop_zone(drop_zone)
+        
+        # Lista de archivos en la drop zone
+        # Un único Treeview: cada archivo es una fila, no un grupo de widgets
+        self.files_tree = ttk.Treeview(drop_zone, columns=("name",), show="headings",
+                                       selectmode="extended", style='Files.Treeview')
+        self.files_tree.heading("name", text="Archivo", anchor='w')
+        self.files_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # Menú contextual y tecla Supr para quitar los archivos seleccionados
+        self.files_menu = tk.Menu(self.root, tearoff=0)
+        self.files_menu.add_command(label="🗑️ Eliminar", command=self.remove_selected_files)
+        self.files_tree.bind("<Button-3>", self.show_files_menu)
+        self.files_tree.bind("<Delete>", lambda event: self.remove_selected_files())
+        
+        # Texto inicial, superpuesto al Treeview mientras no haya archivos
+        self.empty_state = tk.Label(drop_zone,
+                                   text="🎯 Arrastra archivos PDF aquí\n\nó haz clic para seleccionar",
+                                   font=('Segoe UI', 14),
+                                   fg=self.colors['secondary'],
+                                   bg=self.colors['gray_100'],
+                                   justify=tk.CENTER)
+        self.empty_state.bind("<Button-1>", lambda event: self.select_files())
+        self.update_empty_state()
+        
+        # Botones de archivos
+        files_buttons = tk.Frame(files_card, bg=self.colors['white'])
+        files_buttons.pack(fill=tk.X, padx=20, pady=(0, 20))
+        
+        self.create_button(files_buttons, "📂 Seleccionar", self.select_files, 
+                          self.colors['primary'], side=tk.LEFT)
+        self.create_button(files_buttons, "🗑️ Limpiar", self.clear_files, 
+                          self.colors['danger'], side=tk.LEFT, padx=(10, 0))
+        self.create_button(files_buttons, "👁️ Vista Previa", self.preview_tables, 
+                          self.colors['warning'], side=tk.LEFT, padx=(10, 0))
+        
+        # Contador
+        self.files_count = tk.Label(files_buttons, text="0 archivos",
+                                   font=('Segoe UI', 11, 'bold'),
+                                   fg=self.colors['secondary'], bg=self.colors['white'])
+        self.files_count.pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # ===== TARJETA 2: CONFIGURACIÓN =====
+        config_card = self.create_card(cards_frame, "⚙️ Configuración")
+        config_card.grid(row=0, column=1, sticky='nsew', pady=(0, 15))
+        
+        config_content = tk.Frame(config_card, bg=self.colors['white'])
+        config_content.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        # Carpeta de salida
+        tk.Label(config_content, text="📁 Carpeta de salida",
+                font=('Segoe UI', 11, 'bold'),
+                fg=self.colors['gray_800'], bg=self.colors['white']).pack(anchor='w', pady=(0, 5))
+        
+        output_frame = tk.Frame(config_content, bg=self.colors['gray_100'], 
+                               relief=tk.SOLID, bd=1)
+        output_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.output_entry = tk.Entry(output_frame, textvariable=self.output_dir,
+                                    font=('Segoe UI', 10), state='readonly',
+                                    bg=self.colors['white'], fg=self.colors['gray_800'],
+                                    relief=tk.FLAT, bd=5)
+        self.output_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
+        btn_frame = tk.Frame(output_frame, bg=self.colors['gray_100'])
+        btn_frame.pack(side=tk.RIGHT, padx=5, pady=2)
+        
+        self.create_small_button(btn_frame, "📁", self.select_output_dir, 
+                                self.colors['success'])
+        self.create_small_button(btn_frame, "🗂️", self.open_output_folder, 
+                                self.colors['warning'], padx=(5, 0))
+        
+        # Formato
+        tk.Label(config_content, text="📊 Formato de salida",
+                font=('Segoe UI', 11, 'bold'),
+                fg=self.colors['gray_800'], bg=self.colors['white']).pack(anchor='w', pady=(0, 5))
+        
+        format_frame = tk.Frame(config_content, bg=self.colors['gray_100'],
+                               relief=tk.SOLID, bd=1)
+        format_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        formats = [("📊 Excel", "excel"), ("📄 CSV", "csv"), ("📊📄 Ambos", "both")]
+        for i, (text, value) in enumerate(formats):
+            tk.Radiobutton(format_frame, text=text, variable=self.output_format, value=value,
+                          font=('Segoe UI', 10), bg=self.colors['gray_100'],
+                          fg=self.colors['gray_800']).pack(anchor='w', padx=10, pady=3)
+        
+        # ===== TARJETA 3: PROCESAMIENTO =====
+        process_card = self.create_card(cards_frame, "🚀 Procesamiento")
+        process_card.grid(row=1, column=0, columnspan=2, sticky='ew', pady=(0, 0))
+        
+        process_content = tk.Frame(process_card, bg=self.colors['white'])
+        process_content.pack(fill=tk.X, padx=20, pady=20)
+        
+        # Botón principal
+        self.process_button = tk.Button(process_content,
+                                       text="🚀 EXTRAER TABLAS",
+                                       command=self.process_files,
+                                       font=('Segoe UI', 16, 'bold'),
+                                       bg=self.colors['primary'], fg='white',
+                                       relief=tk.FLAT, bd=0,
+                                       padx=40, pady=15,
+                                       cursor='hand2')
+        self.process_button.pack(pady=(0, 15))
+        
+        # Estado y progreso
+        status_frame = tk.Frame(process_content, bg=self.colors['white'])
+        status_frame.pack(fill=tk.X)
+        
+        self.status_label = tk.Label(status_frame,
+                                    text="⭐ Listo para procesar",
+                                    font=('Segoe UI', 12, 'bold'),
+                                    fg=self.colors['success'], bg=self.colors['white'])
+        self.status_label.pack(pady=(0, 10))
+        
+        # Barra de progreso moderna
+        progress_container = tk.Frame(status_frame, bg=self.colors['gray_200'], 
+                                     relief=tk.FLAT, bd=0, height=8)
+        progress_container.pack(fill=tk.X, pady=(0, 20))
+        progress_container.pack_propagate(False)
+        
+        self.progress = ttk.Progressbar(progress_container, mode='determinate',
+                                       style='Modern.Horizontal.TProgressbar')
+        self.progress.pack(fill=tk.BOTH, expand=True)
+        
+        # ===== LOG MODERNO EN LA PARTE INFERIOR =====
+        log_frame = tk.Frame(main_container, bg=self.colors['white'],
+                            relief=tk.SOLID, bd=1, height=200)
+        log_frame.pack(fill=tk.X, pady=(30, 0))
+        log_frame.pack_propagate(False)
+        
+        log_header = tk.Frame(log_frame, bg=self.colors['gray_100'], height=40)
+        log_header.pack(fill=tk.X)
+        log_header.pack_propagate(False)
+        
+        tk.Label(log_header, text="📋 Registro de Actividad",
+                font=('Segoe UI', 12, 'bold'),
+                fg=self.colors['gray_800'], bg=self.colors['gray_100']).pack(side=tk.LEFT, padx=15, pady=10)
+        
+        self.clear_log_btn = tk.Button(log_header, text="🗑️ Limpiar",
+                                      command=self.clear_log,
+                                      font=('Segoe UI', 9),
+                                      bg=self.colors['gray_300'], fg=self.colors['gray_800'],
+                                      relief=tk.FLAT, bd=0, padx=10, pady=5)
+        self.clear_log_btn.pack(side=tk.RIGHT, padx=15, pady=7)
+        
+        self.log_text = scrolledtext.ScrolledText(log_frame,
+                                                 font=('Consolas', 10),
+                                                 bg=self.colors['white'],
+                                                 fg=self.colors['gray_800'],
+                                                 relief=tk.FLAT, bd=0,
+                                                 wrap=tk.WORD,
+                                                 state=tk.DISABLED)
+        self.log_text.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
+    
+    def create_card(self, parent, title):
+        """Crear tarjeta moderna con borde"""
+        # Un solo widget: el borde gris del estilo sustituye al marco de sombra
+        card = ttk.Frame(parent, style='Card.TFrame')
+        
+        # Header de la tarjeta
+        header = tk.Frame(card, bg=self.colors['primary'], height=50)
+        header.pack(fill=tk.X)
+        header.pack_propagate(False)
+        
+        title_label = tk.Label(header, text=title,
+                              font=('Segoe UI', 14, 'bold'),
+                              fg='white', bg=self.colors['primary'])
+        title_label.pack(pady=15, padx=20, anchor='w')
+        
+        return card
+    
+    def create_button(self, parent, text, command, color, side=None, padx=0):
+        btn = tk.Button(parent, text=text, command=command,
+                       font=('Segoe UI', 10, 'bold'),
+                       bg=color, fg='white',
+                       relief=tk.FLAT, bd=0,
+                       padx=15, pady=8,
+                       cursor='hand2')
+        if side:
+            btn.pack(side=side, padx=padx)
+        else:
+            btn.pack(padx=padx)
+        return btn
+    
+    def create_small_button(self, parent, text, command, color, padx=0):
+        btn = tk.Button(parent, text=text, command=command,
+                       font=('Segoe UI', 9, 'bold'),
+                       bg=color, fg='white',
+                       relief=tk.FLAT, bd=0,
+                       padx=8, pady=6,
+                       cursor='hand2')
+        btn.pack(side=tk.LEFT, padx=padx)
+        return btn
+    
+    def setup_drop_zone(self, drop_zone):
+        """Configurar zona de arrastrar y soltar"""
+        def on_click(event):
+            self.select_files()
+        
+        def on_enter(event):
+            drop_zone.config(bg=self.colors['gray_200'])
+        
+        def on_leave(event):
+            drop_zone.config(bg=self.colors['gray_100'])
+        
+        drop_zone.bind("<Button-1>", on_click)
+        drop_zone.bind("<Enter>", on_enter)
+        drop_zone.bind("<Leave>", on_leave)
+        
+        # Hacer que todos los widgets hijos también respondan al click
+        for child in drop_zone.winfo_children():
+            child.bind("<Button-1>", on_click)
+    
+    def add_log(self, message):
+        """Agregar mensaje al log (seguro desde cualquier hilo: solo lo encola)
+        
+        Los mensajes usan etiquetas ASCII ([INFO], [OK], [WARN], [ERR]) en lugar de
+        emojis: el log puede tener miles de líneas y cada emoji obliga a Tk a usar una
+        fuente de respaldo al redibujar. Los emojis quedan en títulos y botones.
+        """
+        self._log_queue.put(message)
+    
+    def _drain_log_queue(self):
+        """Escribir en el log todos los mensajes pendientes con un único insert"""
+        messages = []
+        try:
+            while True:
+                messages.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if messages:
+            self.log_text.config(state=tk.NORMAL)
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            self.log_text.see(tk.END)
+            self.log_text.config(state=tk.DISABLED)
+        
+        self.root.after(50, self._drain_log_queue)
+    
+    def clear_log(self):
+        """Limpiar el log"""
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.delete(1.0, tk.END)
+        self.log_text.config(state=tk.DISABLED)
+    
+    def select_files(self):
+        files = filedialog.askopenfilenames(
+            title="Seleccionar archivos PDF",
+            filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")]
+        )
+        
+        if files:
+            rejected = 0
+            for file in files:
+                if file in self._pdf_jobs:
+                    continue
+                # Los archivos que no son PDF se descartan aquí, sin llegar al pool
+                if not _is_pdf(file):
+                    self.add_log(f"[WARN] No es un PDF válido, se omite: {os.path.basename(file)}")
+                    rejected += 1
+                    continue
+                job = PdfJob.from_path(file)
+                self._pdf_jobs[self.add_file_widget(job)] = job
+            
+            self.update_empty_state()
+            self.update_count()
+            self.add_log(f"[OK] Agregados {len(files) - rejected} archivo(s) PDF")
+    
+    def add_file_widget(self, job):
+        """Agregar el archivo como fila de la lista y devolver su iid (la ruta)"""
+        return self.files_tree.insert("", tk.END, iid=job.path, values=(job.basename,))
+    
+    def update_empty_state(self):
+        """Mostrar el texto inicial solo cuando la lista está vacía"""
+        if self.files_tree.get_children():
+            self.empty_state.place_forget()
+        else:
+            self.empty_state.place(relx=0.5, rely=0.5, anchor='center')
+    
+    def show_files_menu(self, event):
+        """Abrir el menú contextual sobre la fila pulsada"""
+        row = self.files_tree.identify_row(event.y)
+        if row:
+            if row not in self.files_tree.selection():
+                self.files_tree.selection_set(row)
+            self.files_menu.tk_popup(event.x_root, event.y_root)
+    
+    def remove_selected_files(self):
+        """Eliminar los archivos seleccionados en la lista"""
+        for item in self.files_tree.selection():
+            self.remove_file(item)
+    
+    def remove_file(self, item):
+        """Eliminar archivo de la lista a partir del iid de su fila"""
+        job = self._pdf_jobs.pop(item)
+        self.files_tree.delete(item)
+        self.update_count()
+        self.update_empty_state()
+        
+        self.add_log(f"[INFO] Eliminado: {job.basename}")
+    
+    def clear_files(self):
+        """Limpiar todos los archivos"""
+        self._pdf_jobs.clear()
+        self.files_tree.delete(*self.files_tree.get_children())
+        self.update_empty_state()
+        
+        self.update_count()
+        self.add_log("[INFO] Lista de archivos limpiada")
+    
+    def update_count(self):
+        """Actualizar contador de archivos"""
+        count = len(self._pdf_jobs)
+        if count == 0:
+            self.files_count.config(text="0 archivos", fg=self.colors['secondary'])
+        elif count == 1:
+            self.files_count.config(text="1 archivo", fg=self.colors['success'])
+        else:
+            self.files_count.config(text=f"{count} archivos", fg=self.colors['success'])
+    
+    def select_output_dir(self):
+        directory = filedialog.askdirectory(title="Seleccionar carpeta de salida")
+        if directory:
+            self.output_dir.set(directory)
+            self.add_log(f"[INFO] Carpeta cambiada: {directory}")
+    
+    def open_output_folder(self):
+        folder_path = self.output_dir.get()
+        
+        if not os.path.exists(folder_path):
+            messagebox.showwarning("Carpeta no encontrada", 
+                                 f"La carpeta {folder_path} no existe.")
+            return
+        
+        try:
+            if platform.system() == "Windows":
+                os.startfile(folder_path)
+            elif platform.system() == "Darwin":  # macOS
+                subprocess.Popen(["open", folder_path])
+            else:  # Linux
+                subprocess.Popen(["xdg-open", folder_path])
+            
+            self.add_log(f"[INFO] Carpeta abierta: {folder_path}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir la carpeta:\n{str(e)}")
+    
+    def preview_tables(self):
+        if not self._pdf_jobs:
+            messagebox.showwarning("Sin archivos", 
+                                 "Por favor selecciona al menos un archivo PDF primero.")
+            return
+        
+        self.add_log("[INFO] Abriendo vista previa de tablas...")
+        
+        # La detección de tablas se hace fuera del hilo de la UI; el resultado va al log
+        first_job = next(iter(self._pdf_jobs.values()))
+        thread = threading.Thread(target=self._preview_worker, args=(first_job.path,))
+        thread.daemon = True
+        thread.start()
+    
+    def _preview_worker(self, pdf_file, max_rows=10):
+        """Mostrar en el log la primera tabla de la primera página del PDF"""
+        try:
+            # pdfplumber-rs es una reimplementación nativa con la misma API
+            import pdfplumber_rs as pdfplumber
+        except ImportError:
+            try:
+                import pdfplumber
+            except ImportError:
+                self.add_log("[WARN] Vista previa no disponible: instala pdfplumber")
+                return
+        
+        try:
+            # Solo se analiza la primera página
+            with pdfplumber.open(pdf_file) as pdf:
+                tables = pdf.pages[0].find_tables() if pdf.pages else []
+                rows = tables[0].extract() if tables else []
+        except Exception as e:
+            self.add_log(f"[ERR] Error en vista previa: {str(e)}")
+            return
+        
+        filename = os.path.basename(pdf_file)
+        if not rows:
+            self.add_log(f"[INFO] {filename}: no se detectaron tablas en la primera página")
+            return
+        
+        lines = [f"[INFO] {filename}: {len(tables)} tabla(s) en la primera página, primera tabla:"]
+        lines.extend(" | ".join("" if cell is None else str(cell) for cell in row)
+                     for row in rows[:max_rows])
+        if len(rows) > max_rows:
+            lines.append(f"... ({len(rows) - max_rows} filas más)")
+        self.add_log("\n".join(lines))
+    
+    def process_files(self):
+        if not self._pdf_jobs:
+            messagebox.showwarning("Sin archivos", 
+                                 "Por favor selecciona al menos un archivo PDF primero.")
+            return
+        
+        # Deshabilitar botón y mostrar progreso
+        self.process_button.config(state=tk.DISABLED)
+        # Progreso real: avanza un paso por archivo terminado, sin animación por temporizador
+        self.progress.config(mode='determinate', maximum=len(self._pdf_jobs), value=0)
+        self.status_label.config(text="🔄 Procesando archivos...", fg=self.colors['warning'])
+        
+        # Ejecutar en hilo separado
+        thread = threading.Thread(target=self._process_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def _process_thread(self):
+        pool = self._pool
+        try:
+            results = []
+            jobs = list(self._pdf_jobs.values())
+            total_files = len(jobs)
+            
+            # Cada PDF se procesa en un proceso del pool compartido (los backends de PDF
+            # no son seguros entre hilos); los resultados llegan según terminan
+            output_dir = self.output_dir.get()
+            format_type = self.output_format.get()
+            futures = {}
+            used_names = set()
+            for i, job in enumerate(jobs):
+                # Generar nombre de salida. PDFs con el mismo nombre en carpetas distintas
+                # se procesan a la vez: cada uno recibe un sufijo para no pisarse
+                output_name = f"{job.stem}_tablas"
+                counter = 1
+                while output_name.casefold() in used_names:
+                    counter += 1
+                    output_name = f"{job.stem}_{counter}_tablas"
+                used_names.add(output_name.casefold())
+                output_file = os.path.join(output_dir, output_name)
+                future = pool.submit(_worker, job.path, output_file, format_type)
+                futures[future] = (job, output_file)
+                self.add_log(f"[INFO] Procesando: {job.basename} ({i+1}/{total_files})")
+            
+            for i, future in enumerate(as_completed(futures)):
+                job, output_file = futures[future]
+                pdf_file = job.path
+                self.root.after(0, self._update_progress, i + 1, total_files)
+                
+                try:
+                    pdf_file, output_file, success = future.result()
+                except Exception as e:
+                    self.add_log(f"[ERR] Error en el proceso: {str(e)}")
+                    success = False
+                    if isinstance(e, BrokenProcessPool):
+                        # Un proceso murió: el pool queda inutilizable, se crea otro
+                        self._replace_pool(pool)
+                results.append((pdf_file, output_file, success))
+                
+                if success:
+                    self.add_log(f"[OK] Exitoso: {os.path.basename(output_file)}")
+                else:
+                    self.add_log(f"[ERR] Error: {job.basename}")
+            
+            # Resumen final
+            successful = sum(1 for _, _, success in results if success)
+            self.add_log(f"\n[INFO] RESULTADO: {successful}/{len(results)} archivos procesados")
+            
+            if successful == len(results):
+                self.root.after(0, lambda: messagebox.showinfo("🎉 Completado", 
+                    f"¡Éxito! {successful} archivo(s) procesados."))
+            elif successful > 0:
+                self.root.after(0, lambda: messagebox.showwarning("⚠️ Parcial", 
+                    f"{successful}/{len(results)} archivos procesados."))
+            else:
+                self.root.after(0, lambda: messagebox.showerror("❌ Error", 
+                    "No se procesó ningún archivo."))
+                    
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._replace_pool(pool)
+            self.add_log(f"[ERR] Error: {str(e)}")
+            self.root.after(0, lambda: messagebox.showerror("Error", f"Error: {str(e)}"))
+        
+        finally:
+            self.root.after(0, self._finish_processing)
+    
+    def _update_progress(self, done, total):
+        """Reflejar en la barra y en el estado los archivos terminados"""
+        self.progress.config(value=done)
+        self.status_label.config(text=f"🔄 Archivo {done}/{total}...")
+    
+    def _finish_processing(self):
+        self.progress.config(value=self.progress.cget('maximum'))
+        self.status_label.config(text="✅ Proceso completado", fg=self.colors['success'])
+        self.process_button.config(state=tk.NORMAL)